@@ -3,7 +3,7 @@ import re
 from typing import List, Dict
 from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
-from .common import fetch, is_asset_url
+from .common import fetch, is_asset_url, page_text, page_coords
 
 MAX_PER_SITE = 80  # on augmente pour voir plus d'annonces
 
@@ -90,7 +90,9 @@ def parse_detail(url: str) -> Dict:
         surface_hab=_num_from_text(surface_el or ""),
         bedrooms=_num_from_text(beds_el or ""),
         photos=imgs[:3],
-        source_name=urlparse(url).netloc
+        source_name=urlparse(url).netloc,
+        **dict(zip(("lat", "lon"), page_coords(soup))),
+        description=page_text(soup)
     )
     # on ignore les fiches sans prix (bruit)
     if data["price_total"] <= 0:
@@ -1,6 +1,6 @@
 # src/connectors/collect.py
-from typing import List, Dict
-from .common import iter_sitemap, fetch, is_asset_url
+from typing import Callable, List, Dict
+from .common import iter_sitemap, fetch, is_asset_url, page_text, page_coords
 from .agencies import collect_agencies
 from src.config_loader import load_sources_config
 
@@ -20,9 +20,12 @@ def _num_text(soup, selectors) -> int:
             continue
     return 0
 
-def parse_laforet_sitemap() -> List[Dict]:
+LAFORET_SITEMAP = "https://www.laforet.com/sitemap-annonces.xml"
+ORPI_SITEMAP = "https://www.orpi.com/sitemap.xml"
+
+def parse_laforet_sitemap(sitemap: str = LAFORET_SITEMAP) -> List[Dict]:
     out = []
-    for url in iter_sitemap("https://www.laforet.com/sitemap-annonces.xml"):
+    for url in iter_sitemap(sitemap):
         if "971" not in url.lower() and "guadeloupe" not in url.lower():
             continue
         try:
@@ -39,15 +42,16 @@ def parse_laforet_sitemap() -> List[Dict]:
             out.append(dict(
                 id=url, url=url, title=title,
                 price_total=price, surface_hab=surface, bedrooms=beds,
-                photos=photos, source_name="laforet.com"
+                photos=photos, source_name="laforet.com",
+                **dict(zip(("lat", "lon"), page_coords(soup))), description=page_text(soup)
             ))
         except Exception:
             continue
     return out
 
-def parse_orpi_sitemap() -> List[Dict]:
+def parse_orpi_sitemap(sitemap: str = ORPI_SITEMAP) -> List[Dict]:
     out = []
-    for url in iter_sitemap("https://www.orpi.com/sitemap.xml"):
+    for url in iter_sitemap(sitemap):
         if "971" not in url.lower() and "guadeloupe" not in url.lower():
             continue
         try:
@@ -64,26 +68,22 @@ def parse_orpi_sitemap() -> List[Dict]:
             out.append(dict(
                 id=url, url=url, title=title,
                 price_total=price, surface_hab=surface, bedrooms=beds,
-                photos=photos, source_name="orpi.com"
+                photos=photos, source_name="orpi.com",
+                **dict(zip(("lat", "lon"), page_coords(soup))), description=page_text(soup)
             ))
         except Exception:
             continue
     return out
 
-def collect_all() -> List[Dict]:
-    cfg = load_sources_config()
-    data: List[Dict] = []
-
-    if any(s.get("name")=="Laforet971" and s.get("enabled") for s in cfg.get("sources", [])):
-        data += parse_laforet_sitemap()
-    if any(s.get("name")=="Orpi971" and s.get("enabled") for s in cfg.get("sources", [])):
-        data += parse_orpi_sitemap()
-
-    for s in cfg.get("sources", []):
-        if s.get("name")=="AgencesLocales" and s.get("enabled"):
-            data += collect_agencies(s.get("base_urls", []))
+# Collecteur par nom de source (config/sources.yaml)
+COLLECTORS: Dict[str, Callable[[Dict], List[Dict]]] = {
+    "Laforet971": lambda s: parse_laforet_sitemap(s.get("sitemap") or LAFORET_SITEMAP),
+    "Orpi971": lambda s: parse_orpi_sitemap(s.get("sitemap") or ORPI_SITEMAP),
+    "AgencesLocales": lambda s: collect_agencies(s.get("base_urls", [])),
+}
 
-    # filtre final : pas d’asset, prix > 0
+def clean_rows(data: List[Dict]) -> List[Dict]:
+    """Filtre final : pas d’asset, prix > 0."""
     cleaned = []
     for r in data:
         if not r:
@@ -97,3 +97,16 @@ def collect_all() -> List[Dict]:
             continue
         cleaned.append(r)
     return cleaned
+
+def enabled_sources(cfg: Dict | None = None) -> List[Dict]:
+    cfg = cfg if cfg is not None else load_sources_config()
+    return [s for s in cfg.get("sources", []) if s.get("enabled") and s.get("name") in COLLECTORS]
+
+def collect_source(source: Dict) -> List[Dict]:
+    return clean_rows(COLLECTORS[source["name"]](source))
+
+def collect_all(cfg: Dict | None = None) -> List[Dict]:
+    data: List[Dict] = []
+    for s in enabled_sources(cfg):
+        data += collect_source(s)
+    return data
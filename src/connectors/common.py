@@ -1,5 +1,5 @@
 # src/connectors/common.py
-import time, re, requests
+import json, time, re, requests
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 
@@ -18,17 +18,88 @@ def is_asset_url(url: str) -> bool:
         return True
     return False
 
+# Session partagée : connexions keep-alive réutilisées d'une page à l'autre
+SESSION = requests.Session()
+SESSION.headers["User-Agent"] = UA
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16))
+SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
 def fetch(url, sleep=0.8, parser="html.parser"):
     """Requête douce + parser robuste; renvoie un soup vide si erreur."""
     time.sleep(sleep)
     try:
-        r = requests.get(url, headers={"User-Agent": UA}, timeout=20, allow_redirects=True)
+        r = SESSION.get(url, timeout=20, allow_redirects=True)
         if not r.ok:
             raise Exception(f"HTTP {r.status_code} on {url}")
         return BeautifulSoup(r.text, parser)
     except Exception:
         return BeautifulSoup("", parser if parser != "xml" else "html.parser")
 
+# JSON-LD décrivant l'agence (adresse du bureau), pas le bien
+AGENCY_LD_TYPES = {"organization", "realestateagent", "localbusiness", "corporation", "website", "webpage"}
+LAT_LON_ATTRS = [("data-lat", "data-lng"), ("data-lat", "data-lon"), ("data-latitude", "data-longitude")]
+JSON_LAT_RE = re.compile(r'"(?:lat|latitude)"\s*:\s*"?(-?\d+\.\d+)')
+JSON_LON_RE = re.compile(r'"(?:lng|lon|longitude)"\s*:\s*"?(-?\d+\.\d+)')
+
+def _ld_geo(node, out):
+    """Blocs "geo" du JSON-LD, hors sous-arbres décrivant l'agence."""
+    if isinstance(node, list):
+        for n in node:
+            _ld_geo(n, out)
+    elif isinstance(node, dict):
+        types = node.get("@type") or []
+        types = [types] if isinstance(types, str) else types
+        if any(str(t).lower() in AGENCY_LD_TYPES for t in types):
+            return
+        geo = node.get("geo")
+        if isinstance(geo, dict) and geo.get("latitude") and geo.get("longitude"):
+            out.append(f"{geo['latitude']},{geo['longitude']}")
+        for k, v in node.items():
+            if k != "geo":
+                _ld_geo(v, out)
+
+def page_coords(soup):
+    """(lat, lon) précis de la page (meta geo, data-lat/lng, lien carte, JSON-LD), sinon (None, None)."""
+    from src.geo import parse_coords
+    if not soup:
+        return None, None
+    cands = []
+    meta = soup.find("meta", attrs={"name": re.compile(r"^(geo\.position|icbm)$", re.I)})
+    if meta and meta.get("content"):
+        cands.append(meta["content"])
+    for a_lat, a_lon in LAT_LON_ATTRS:
+        el = soup.find(attrs={a_lat: True, a_lon: True})
+        if el:
+            cands.append(f"{el[a_lat]},{el[a_lon]}")
+    for el in soup.select("a[href*='map'], iframe[src*='map']"):
+        if el.find_parent(["footer", "header", "nav"]):
+            continue  # carte du bureau de l'agence
+        cands.append(el.get("href") or el.get("src") or "")
+    for sc in soup.find_all("script"):
+        txt = sc.string or ""
+        if (sc.get("type") or "").lower() == "application/ld+json":
+            try:
+                _ld_geo(json.loads(txt), cands)
+            except ValueError:
+                pass
+            continue
+        la, lo = JSON_LAT_RE.search(txt), JSON_LON_RE.search(txt)
+        if la and lo:
+            cands.append(f"{la.group(1)},{lo.group(1)}")
+    for c in cands:
+        lat, lon = parse_coords(c)
+        if lat == lat:  # non NaN
+            return lat, lon
+    return None, None
+
+def page_text(soup, limit=8000) -> str:
+    """Texte visible de la page (sans scripts/styles), tronqué."""
+    if not soup:
+        return ""
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    return soup.get_text(" ", strip=True)[:limit]
+
 def iter_sitemap(url):
     """Itère des URLs d’annonces depuis un sitemap (fallback HTML)."""
     url = url.replace("sitemap.xml/", "sitemap.xml").rstrip("/")
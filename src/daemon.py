@@ -0,0 +1,179 @@
+import json
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+from src.config_loader import load_sources_config
+from src.connectors.collect import enabled_sources, collect_source
+from src.run_pipeline import PipelineState, run_once
+from src.text_features import text_pool
+
+# --------------------------------------------------------------------
+# Mode démon : un seul processus, caches chauds, rafraîchissement
+# par source selon `refresh_minutes` (config/sources.yaml)
+# --------------------------------------------------------------------
+DEFAULT_REFRESH_MIN = 360
+
+
+class Metrics:
+    """Compteurs partagés entre la boucle et le serveur de santé."""
+
+    def __init__(self, stale_after: float = 2 * 60.0 * DEFAULT_REFRESH_MIN):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.stale_after = stale_after  # s sans passage réussi avant "degraded"
+        self.port = None
+        self.runs = 0
+        self.run_errors = 0
+        self.last_run = None
+        self.last_ok = None
+        self.last_duration = None
+        self.listings = 0
+        self.sources: Dict[str, Dict] = {}
+
+    def source_done(self, name: str, rows: int, ok: bool) -> None:
+        with self.lock:
+            s = self.sources.setdefault(name, {"rows": 0, "errors": 0, "last_refresh": None})
+            if ok:
+                s["rows"], s["last_refresh"] = rows, time.time()
+            else:
+                s["errors"] += 1
+
+    def run_done(self, duration: float, listings: int | None) -> None:
+        with self.lock:
+            self.last_ok = listings is not None
+            if listings is None:
+                self.run_errors += 1
+            else:
+                self.runs += 1
+                self.listings = listings
+                self.last_run = time.time()
+            self.last_duration = duration
+
+    def _status(self) -> str:
+        """Dernier passage en échec, ou aucun succès depuis `stale_after` : "degraded"."""
+        if self.last_ok is None:
+            return "starting"
+        since = time.time() - (self.last_run or self.started)
+        return "ok" if self.last_ok and since <= self.stale_after else "degraded"
+
+    def health(self) -> Dict:
+        with self.lock:
+            return {
+                "status": self._status(),
+                "uptime_s": round(time.time() - self.started, 1),
+                "runs": self.runs, "run_errors": self.run_errors,
+                "last_run": self.last_run, "listings": self.listings,
+                "sources": {k: dict(v) for k, v in self.sources.items()},
+            }
+
+    def prometheus(self) -> str:
+        with self.lock:
+            lines = [
+                f"immo_uptime_seconds {time.time() - self.started:.1f}",
+                f"immo_up {int(self._status() != 'degraded')}",
+                f"immo_runs_total {self.runs}",
+                f"immo_run_errors_total {self.run_errors}",
+                f"immo_last_run_duration_seconds {self.last_duration or 0:.3f}",
+                f"immo_last_success_timestamp {self.last_run or 0:.0f}",
+                f"immo_listings {self.listings}",
+            ]
+            for name, s in self.sources.items():
+                lines.append(f'immo_source_rows{{source="{name}"}} {s["rows"]}')
+                lines.append(f'immo_source_errors_total{{source="{name}"}} {s["errors"]}')
+                lines.append(f'immo_source_last_refresh_timestamp{{source="{name}"}} {s["last_refresh"] or 0:.0f}')
+            return "\n".join(lines) + "\n"
+
+
+def start_health_server(metrics: Metrics, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """/health (JSON) et /metrics (format texte Prometheus), dans un thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            code = 200
+            if self.path == "/health":
+                health = metrics.health()
+                body, ctype = json.dumps(health).encode("utf-8"), "application/json"
+                code = 503 if health["status"] == "degraded" else 200
+            elif self.path == "/metrics":
+                body, ctype = metrics.prometheus().encode("utf-8"), "text/plain; version=0.0.4"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(code)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def due_sources(sources: List[Dict], next_due: Dict[str, float], now: float) -> List[Dict]:
+    return [s for s in sources if next_due.get(s["name"], 0.0) <= now]
+
+
+def run_daemon(host: str = "127.0.0.1", port: int = 8765, tick: float = 30.0,
+               max_cycles: int | None = None, stop: threading.Event | None = None,
+               metrics: Metrics | None = None) -> Metrics:
+    """
+    Boucle principale : collecte les sources arrivées à échéance, réutilise
+    les annonces en mémoire des autres, puis relance le pipeline.
+    `port=0` : port libre, lu ensuite dans `metrics.port`. Avec `max_cycles`,
+    la boucle s'arrête après l'attente qui suit le dernier passage.
+    """
+    stop = stop or threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    sources = enabled_sources(load_sources_config())
+    refresh = max([float(s.get("refresh_minutes", DEFAULT_REFRESH_MIN)) for s in sources] or [DEFAULT_REFRESH_MIN])
+    state, metrics = PipelineState(), metrics or Metrics()
+    state.pool = text_pool()  # un seul pool pour toute la vie du démon
+    metrics.stale_after = 2 * 60.0 * refresh  # deux périodes de la source la plus lente
+    server = start_health_server(metrics, host, port)
+    metrics.port = server.server_port
+    rows_by_source: Dict[str, List[Dict]] = {}
+    next_due: Dict[str, float] = {}
+    cycles = 0
+    print(f"Démon démarré — {len(sources)} sources, santé sur http://{host}:{server.server_port}/health")
+
+    try:
+        while not stop.is_set():
+            now = time.time()
+            due = due_sources(sources, next_due, now)
+            for s in due:
+                try:
+                    rows_by_source[s["name"]] = collect_source(s)
+                    metrics.source_done(s["name"], len(rows_by_source[s["name"]]), True)
+                except Exception:
+                    metrics.source_done(s["name"], 0, False)
+                next_due[s["name"]] = now + 60.0 * float(s.get("refresh_minutes", DEFAULT_REFRESH_MIN))
+
+            if due:
+                t0 = time.time()
+                try:
+                    rows = [r for name in rows_by_source for r in rows_by_source[name]]
+                    df = run_once(rows, state)
+                    metrics.run_done(time.time() - t0, len(df))
+                except Exception as e:
+                    print("Erreur pipeline —", e)
+                    metrics.run_done(time.time() - t0, None)
+                cycles += 1
+            stop.wait(tick)
+            if max_cycles is not None and cycles >= max_cycles:
+                break
+    finally:
+        server.shutdown()
+        server.server_close()
+        if state.pool is not None:
+            state.pool.shutdown()
+    return metrics
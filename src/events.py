@@ -0,0 +1,147 @@
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# --------------------------------------------------------------------
+# Flux d'événements : diff run courant / historique, en un seul passage,
+# ajouté à un JSONL append-only lu par curseur (offset en octets)
+# --------------------------------------------------------------------
+EVENTS_JSONL = "data/events.jsonl"
+CURSOR_DIR = "data/cursors"
+SCORE_ALERT = 70.0
+
+EVENT_TYPES = ["new", "price_drop", "relisted", "removed", "score_crossed_threshold"]
+
+
+def _num(s: pd.Series) -> pd.Series:
+    return pd.to_numeric(s, errors="coerce")
+
+
+def detect_events(df: pd.DataFrame, prev_hist: pd.DataFrame, hist: pd.DataFrame | None = None,
+                  threshold: float = SCORE_ALERT) -> pd.DataFrame:
+    """
+    Compare les annonces scorées à l'historique précédent (jointure externe unique).
+    `hist` (historique mis à jour) décide des retraits : seules les annonces passées
+    à "removed" ce run en produisent un (sinon toute annonce absente).
+    Renvoie un DataFrame d'événements : type, id, url, title, price, prev_price,
+    drop_pct, score, prev_score, direction.
+    """
+    cur = pd.DataFrame({
+        "id": df["id"].astype(str) if "id" in df.columns else pd.Series(dtype=str),
+        "url": df.get("url"), "title": df.get("title"),
+        "price": _num(df.get("price_total", pd.Series(index=df.index, dtype=float))),
+        "score": _num(df.get("score", pd.Series(index=df.index, dtype=float))),
+    }).drop_duplicates("id")
+    prev = pd.DataFrame({
+        "id": prev_hist["id"].astype(str),
+        "prev_price": _num(prev_hist["last_price"]),
+        "prev_status": prev_hist["status"].fillna("available").astype(str),
+        "prev_score": _num(prev_hist.get("last_score", pd.Series(index=prev_hist.index, dtype=float))),
+        "prev_url": prev_hist.get("url"), "prev_title": prev_hist.get("title"),
+    }).drop_duplicates("id")
+
+    m = cur.merge(prev, on="id", how="outer", indicator=True)
+    # annonces absentes de ce run : url / titre mémorisés dans l'historique
+    m["url"] = m["url"].fillna(m["prev_url"])
+    m["title"] = m["title"].fillna(m["prev_title"])
+    both = (m["_merge"] == "both").to_numpy()
+    was_removed = (m["prev_status"] == "removed").to_numpy()
+    gone = (m["_merge"] == "right_only").to_numpy()
+    if hist is not None:
+        now_removed = set(hist.loc[hist["status"] == "removed", "id"].astype(str))
+        gone &= m["id"].isin(now_removed).to_numpy()
+    price, prev_price = m["price"].to_numpy(float), m["prev_price"].to_numpy(float)
+    score, prev_score = m["score"].to_numpy(float), m["prev_score"].to_numpy(float)
+
+    with np.errstate(invalid="ignore"):
+        up = both & (prev_score < threshold) & (score >= threshold)
+        down = both & (prev_score >= threshold) & (score < threshold)
+        masks = {
+            "new": (m["_merge"] == "left_only").to_numpy(),
+            "removed": gone & ~was_removed,
+            "relisted": both & was_removed,
+            "price_drop": both & ~was_removed & (prev_price > 0) & (price > 0) & (price < prev_price),
+            "score_crossed_threshold": up | down,
+        }
+    m["drop_pct"] = np.where(masks["price_drop"], np.round((prev_price - price) / np.where(prev_price > 0, prev_price, 1) * 100, 2), np.nan)
+    m["direction"] = np.where(up, "up", np.where(down, "down", None))
+
+    cols = ["id", "url", "title", "price", "prev_price", "drop_pct", "score", "prev_score", "direction"]
+    parts = [m.loc[mask, cols].assign(type=t) for t, mask in masks.items() if mask.any()]
+    if not parts:
+        return pd.DataFrame(columns=["type", *cols])
+    events = pd.concat(parts, ignore_index=True)
+    return events[["type", *cols]]
+
+
+def _last_seq(path: str, tail: int = 65536) -> int:
+    """Numéro du dernier événement, lu dans la fin du fichier (sans tout relire)."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return 0
+    with open(path, "rb") as f:
+        f.seek(max(0, os.path.getsize(path) - tail))
+        lines = [l for l in f.read().splitlines() if l.strip()]
+    try:
+        return int(json.loads(lines[-1].decode("utf-8")).get("seq", 0))
+    except Exception:
+        return 0
+
+
+def append_events(events: pd.DataFrame, path: str = EVENTS_JSONL) -> int:
+    """Ajoute les événements au flux (append-only) ; renvoie le nombre écrit."""
+    if events.empty:
+        return 0
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    seq = _last_seq(path)
+    ts = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    lines = []
+    for rec in events.to_dict("records"):
+        seq += 1
+        rec = {k: (None if not isinstance(v, str) and pd.isna(v) else v) for k, v in rec.items()}
+        lines.append(json.dumps({"seq": seq, "ts": ts, **rec}, ensure_ascii=False))
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return len(lines)
+
+
+def _cursor_path(consumer: str, cursor_dir: str) -> str:
+    return os.path.join(cursor_dir, f"{consumer}.json")
+
+
+def read_new_events(consumer: str, path: str = EVENTS_JSONL, cursor_dir: str = CURSOR_DIR,
+                    commit: bool = True) -> List[Dict]:
+    """
+    Événements non encore lus par `consumer` : reprise à l'offset mémorisé,
+    puis avance du curseur (si `commit`).
+    """
+    if not os.path.exists(path):
+        return []
+    cpath = _cursor_path(consumer, cursor_dir)
+    cursor = {"offset": 0, "seq": 0}
+    if os.path.exists(cpath):
+        with open(cpath, "r", encoding="utf-8") as f:
+            cursor.update(json.load(f) or {})
+    offset = int(cursor["offset"])
+    if offset > os.path.getsize(path):
+        offset = 0  # flux recréé : on repart du début
+
+    out: List[Dict] = []
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break  # ligne en cours d'écriture
+            offset += len(raw)
+            line = raw.decode("utf-8").strip()
+            if line:
+                out.append(json.loads(line))
+
+    if commit:
+        os.makedirs(cursor_dir, exist_ok=True)
+        with open(cpath, "w", encoding="utf-8") as f:
+            json.dump({"offset": offset, "seq": out[-1]["seq"] if out else cursor["seq"]}, f)
+    return out
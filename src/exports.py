@@ -0,0 +1,134 @@
+import os
+import shutil
+import sys
+import tempfile
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# --------------------------------------------------------------------
+# Exports : Parquet en format principal (types et listes préservés),
+# Excel / CSV / HTML générés à la demande depuis le Parquet
+# --------------------------------------------------------------------
+OUTPUT_DIR = "output"
+LISTINGS_PARQUET = f"{OUTPUT_DIR}/listings.parquet"
+PREVIOUS_PARQUET = f"{OUTPUT_DIR}/listings_prev.parquet"
+
+DIFF_COLS = ["price_total", "score", "status"]
+
+
+def _write_tmp(df: pd.DataFrame, path: str) -> str:
+    """Écrit dans un fichier temporaire du même dossier (même volume, renommage atomique)."""
+    folder = os.path.dirname(path) or "."
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix=".parquet.tmp")
+    os.close(fd)
+    try:
+        df.to_parquet(tmp, index=False)
+    except Exception:
+        os.remove(tmp)
+        raise
+    return tmp
+
+
+def write_parquet_atomic(df: pd.DataFrame, path: str) -> None:
+    """Écrit dans un fichier temporaire du même dossier puis renomme (jamais de fichier partiel)."""
+    os.replace(_write_tmp(df, path), path)
+
+
+def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.copy()
+    if "photos" in out.columns:
+        out["photos"] = out["photos"].apply(lambda x: [str(u) for u in x] if isinstance(x, (list, tuple, np.ndarray)) else [])
+    # colonnes objet hétérogènes (dates lues en CSV, zones...) : texte, None si manquant
+    for c in out.columns:
+        if c != "photos" and out[c].dtype == object:
+            out[c] = out[c].map(lambda x: None if pd.isna(x) else str(x))
+    return out
+
+
+def _keep_previous(path: str, previous: str) -> None:
+    """Copie du run courant vers `previous` (lien dur si possible), `path` reste en place."""
+    tmp = previous + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    try:
+        os.link(path, tmp)
+    except OSError:
+        shutil.copy2(path, tmp)
+    os.replace(tmp, previous)
+
+
+def export_listings(df: pd.DataFrame, path: str = LISTINGS_PARQUET, previous: str = PREVIOUS_PARQUET) -> None:
+    """
+    Écrit le run courant puis conserve le précédent (pour le diff). Ordre :
+    fichier temporaire complet, copie de l'ancien vers `previous`, renommage.
+    `path` existe donc à tout instant, et un échec d'écriture n'altère rien.
+    """
+    tmp = _write_tmp(_prepare(df), path)
+    try:
+        if os.path.exists(path):
+            _keep_previous(path, previous)
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def read_listings(path: str = LISTINGS_PARQUET) -> pd.DataFrame:
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    df = pd.read_parquet(path)
+    if "photos" in df.columns:
+        df["photos"] = df["photos"].apply(lambda x: list(x) if x is not None else [])
+    return df
+
+
+def diff_runs(current: pd.DataFrame, previous: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Nouvelles annonces, annonces disparues et annonces modifiées (prix / score / statut)."""
+    if previous.empty or "id" not in previous.columns:
+        return {"new": current, "removed": current.iloc[0:0], "changed": current.iloc[0:0]}
+    cur = current.drop_duplicates("id", keep="last").set_index("id")
+    prev = previous.drop_duplicates("id", keep="last").set_index("id")
+    new = cur.loc[~cur.index.isin(prev.index)].reset_index()
+    removed = prev.loc[~prev.index.isin(cur.index)].reset_index()
+
+    common = cur.index.intersection(prev.index)
+    cols = [c for c in DIFF_COLS if c in cur.columns and c in prev.columns]
+    a, b = cur.loc[common, cols], prev.loc[common, cols]
+    same = (a.to_numpy(object) == b.to_numpy(object)) | (a.isna().to_numpy() & b.isna().to_numpy())
+    mask = pd.Series(~same.all(axis=1), index=a.index)
+    changed = a.loc[mask].join(b.loc[mask], rsuffix="_prev").reset_index()
+    return {"new": new, "removed": removed, "changed": changed}
+
+
+def export_on_demand(fmt: str, dest: str | None = None, top: int | None = None,
+                     src: str = LISTINGS_PARQUET) -> str:
+    """Génère xlsx / csv / html à partir du Parquet (tri par score, `top` premières lignes)."""
+    df = read_listings(src)
+    if "score" in df.columns:
+        df = df.sort_values("score", ascending=False)
+    if top:
+        df = df.head(top)
+    if "photos" in df.columns:
+        df["photos"] = df["photos"].apply(" ".join)
+    dest = dest or f"{OUTPUT_DIR}/{'top' + str(top) if top else 'all_listings'}.{fmt}"
+    if fmt == "xlsx":
+        df.to_excel(dest, index=False)
+    elif fmt == "csv":
+        df.to_csv(dest, index=False)
+    elif fmt == "html":
+        df.to_html(dest, index=False)
+    else:
+        raise ValueError(f"Format inconnu : {fmt}")
+    return dest
+
+
+if __name__ == "__main__":
+    # python -m src.exports xlsx|csv|html [top]
+    if len(sys.argv) < 2:
+        print("usage: python -m src.exports xlsx|csv|html [top]")
+        sys.exit(1)
+    print(export_on_demand(sys.argv[1], top=int(sys.argv[2]) if len(sys.argv) > 2 else None))
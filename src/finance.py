@@ -0,0 +1,130 @@
+import os
+from functools import lru_cache
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from src.geo import norm_text
+
+# --------------------------------------------------------------------
+# Modèle financier vectorisé : loyer, rendement net, cashflow, travaux
+# --------------------------------------------------------------------
+FINANCE_YAML = "config/finance.yaml"
+
+TEXT_COLS = ["title", "url", "description"]
+
+# Indice nié dans le texte normalisé ("aucun travaux a prevoir", "sans gros travaux")
+_NEGATIONS = ["sans", "pas de", "aucun", "aucuns", "aucune", "sans gros", "pas de gros", "aucun gros"]
+_NOT = "".join(f"(?<!{w} )" for w in _NEGATIONS)
+
+
+@lru_cache(maxsize=None)
+def load_finance_config(path: str = FINANCE_YAML) -> Dict:
+    """Paramètres de prêt, frais et tables de référence (chargés une seule fois)."""
+    data: Dict = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+    pret = data.get("pret", {}) or {}
+    frais = data.get("frais", {}) or {}
+    return {
+        "taux_annuel": float(pret.get("taux_annuel", 0.04)),
+        "duree_ans": int(pret.get("duree_ans", 20)),
+        "apport_pct": float(pret.get("apport_pct", 0.10)),
+        "notaire_pct": float(frais.get("notaire_pct", 0.08)),
+        "gestion_pct": float(frais.get("gestion_pct", 0.0)),
+        "vacance_pct": float(frais.get("vacance_pct", 0.0)),
+        "entretien_pct": float(frais.get("entretien_pct", 0.0)),
+        "loyer_m2_defaut": float(data.get("loyer_m2_defaut", 11.0)),
+        "loyers_m2": {k: float(v) for k, v in (data.get("loyers_m2") or {}).items()},
+        "travaux_m2": [(t["motif"], float(t["eur_m2"])) for t in (data.get("travaux_m2") or [])],
+        "travaux_m2_defaut": float(data.get("travaux_m2_defaut", 0.0)),
+    }
+
+
+def monthly_payment(principal: np.ndarray, rate: np.ndarray | float, years: int) -> np.ndarray:
+    """Mensualité d'un prêt amortissable ; `rate` peut être un tableau (balayage de taux)."""
+    n = years * 12
+    r = np.asarray(rate, dtype=float) / 12.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pay = principal * r / (1.0 - (1.0 + r) ** -n)
+    return np.where(r == 0, principal / n, pay)
+
+
+def _num(df: pd.DataFrame, col: str) -> np.ndarray:
+    s = df[col] if col in df.columns else pd.Series(np.nan, index=df.index)
+    return pd.to_numeric(s, errors="coerce").to_numpy(float)
+
+
+def _text(df: pd.DataFrame) -> pd.Series:
+    parts = [df[c].fillna("").astype(str) for c in TEXT_COLS if c in df.columns]
+    text = pd.Series("", index=df.index) if not parts else parts[0].str.cat(parts[1:], sep=" ")
+    return text.map(norm_text)
+
+
+def estimate_rent(df: pd.DataFrame, cfg: Dict) -> np.ndarray:
+    """Loyer mensuel estimé = surface × loyer de référence de la commune."""
+    communes = df["commune"] if "commune" in df.columns else pd.Series(None, index=df.index)
+    ref = communes.map(cfg["loyers_m2"]).fillna(cfg["loyer_m2_defaut"]).to_numpy(float)
+    surface = _num(df, "surface_hab")
+    return np.where(surface > 0, surface * ref, np.nan)
+
+
+def estimate_capex(df: pd.DataFrame, cfg: Dict) -> np.ndarray:
+    """Budget travaux (€) à partir des indices textuels (premier motif trouvé, mots entiers, non niés)."""
+    text = _text(df)
+    conds = [text.str.contains(rf"{_NOT}\b(?:{motif})\b", regex=True).to_numpy() for motif, _ in cfg["travaux_m2"]]
+    eur_m2 = np.select(conds, [v for _, v in cfg["travaux_m2"]], default=cfg["travaux_m2_defaut"]) \
+        if conds else np.full(len(df), cfg["travaux_m2_defaut"])
+    surface = _num(df, "surface_hab")
+    return np.where(surface > 0, surface * eur_m2, np.nan)
+
+
+def _model(df: pd.DataFrame, cfg: Dict, rates: np.ndarray) -> Dict[str, np.ndarray]:
+    price = _num(df, "price_total")
+    price = np.where(price > 0, price, np.nan)
+
+    rent = _num(df, "rent_potential")
+    rent = np.where(rent > 0, rent, estimate_rent(df, cfg))
+    capex = estimate_capex(df, cfg)
+
+    charges_an = np.nan_to_num(_num(df, "charges_copro_an")) + np.nan_to_num(_num(df, "taxe_fonciere"))
+    loyers_an = rent * 12.0 * (1.0 - cfg["vacance_pct"])
+    net_an = loyers_an * (1.0 - cfg["gestion_pct"] - cfg["entretien_pct"]) - charges_an
+
+    cost = price * (1.0 + cfg["notaire_pct"]) + np.nan_to_num(capex)
+    principal = cost * (1.0 - cfg["apport_pct"])
+    # colonnes = taux balayés, lignes = annonces
+    pay = monthly_payment(principal[:, None], rates[None, :], cfg["duree_ans"])
+    return dict(
+        rent=rent, capex=capex, price=price,
+        yield_net=net_an / cost * 100.0,
+        cashflow=net_an[:, None] / 12.0 - pay,
+    )
+
+
+def enrich_finance(df: pd.DataFrame, cfg: Dict | None = None) -> pd.DataFrame:
+    """
+    Calcule rent_potential, capex_ratio, yield_net (%) et cashflow (€/mois)
+    sur tout le DataFrame. NaN = non calculable (règle neutre au scoring).
+    """
+    if df.empty:
+        return df
+    cfg = cfg or load_finance_config()
+    m = _model(df, cfg, np.array([cfg["taux_annuel"]]))
+    df = df.copy()
+    df["rent_potential"] = np.round(m["rent"], 0)
+    df["capex_ratio"] = np.round(m["capex"] / m["price"], 3)
+    df["yield_net"] = np.round(m["yield_net"], 2)
+    df["cashflow"] = np.round(m["cashflow"][:, 0], 0)
+    return df
+
+
+def cashflow_sensitivity(df: pd.DataFrame, rates: Iterable[float], cfg: Dict | None = None) -> pd.DataFrame:
+    """Cashflow mensuel pour chaque taux de crédit (une colonne par taux)."""
+    cfg = cfg or load_finance_config()
+    rates = np.asarray(list(rates), dtype=float)
+    m = _model(df, cfg, rates)
+    return pd.DataFrame(np.round(m["cashflow"], 0), index=df.index, columns=rates)
@@ -0,0 +1,277 @@
+import json
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import yaml
+
+# --------------------------------------------------------------------
+# Enrichissement géographique hors ligne : commune -> (lat, lon),
+# zones PPR / PLU (GeoJSON locaux) et distance aux commerces (POI locaux)
+# --------------------------------------------------------------------
+COMMUNES_YAML = "config/communes_971.yaml"
+GEO_DIR = "data/geo"
+PPR_GEOJSON = f"{GEO_DIR}/ppr_zones.geojson"
+PLU_GEOJSON = f"{GEO_DIR}/plu_zones.geojson"
+AMENITIES_GEOJSON = f"{GEO_DIR}/amenities.geojson"
+
+# Propriétés GeoJSON lues pour le libellé de zone (première trouvée)
+PPR_PROPS = ["zone", "couleur", "libelle", "typezone"]
+PLU_PROPS = ["typezone", "zone", "libelle"]
+
+# Emprise de l'archipel : des coordonnées hors de ce cadre sont ignorées
+LAT_RANGE = (15.8, 16.6)
+LON_RANGE = (-61.9, -60.9)
+# "16.2345, -61.5432" / "16.2345;-61.5432" (≥ 3 décimales ≈ 100 m)
+COORD_RE = re.compile(r"\b(1[56]\.\d{3,})\s*[,;/ ]\s*(-6[01]\.\d{3,})\b")
+
+# Coordonnées de page trop loin du centroïde de la commune citée : sans doute
+# celles de l'agence (pied de page, JSON-LD), pas celles du bien
+MAX_KM_FROM_COMMUNE = 8.0
+
+CELL_DEG = 0.05          # taille des mailles de l'index (≈ 5 km)
+AVG_SPEED_KMH = 30.0     # vitesse moyenne pour convertir km -> minutes
+KM_PER_DEG_LAT = 111.32
+
+
+def norm_text(text: str) -> str:
+    t = unicodedata.normalize("NFKD", str(text or "")).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", " ", t.lower()).strip()
+
+
+def in_guadeloupe(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore"):
+        return (lat >= LAT_RANGE[0]) & (lat <= LAT_RANGE[1]) & (lon >= LON_RANGE[0]) & (lon <= LON_RANGE[1])
+
+
+def parse_coords(text: str) -> Tuple[float, float]:
+    """Première paire (lat, lon) plausible trouvée dans le texte, sinon (NaN, NaN)."""
+    for m in COORD_RE.finditer(str(text or "")):
+        lat, lon = float(m.group(1)), float(m.group(2))
+        if in_guadeloupe(np.array(lat), np.array(lon)):
+            return lat, lon
+    return np.nan, np.nan
+
+
+# --------------------------------------------------------------------
+# 1) Géocodage par nom de commune (titre / URL / description)
+# --------------------------------------------------------------------
+@lru_cache(maxsize=None)
+def load_communes(path: str = COMMUNES_YAML) -> Tuple[re.Pattern, Dict[str, Tuple[float, float, str]]]:
+    """Renvoie (regex compilée des noms/alias, alias normalisé -> (lat, lon, commune))."""
+    lookup: Dict[str, Tuple[float, float, str]] = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+        for c in data.get("communes", []):
+            entry = (float(c["lat"]), float(c["lon"]), c["name"])
+            for key in [c["name"], *c.get("aliases", [])]:
+                lookup[norm_text(key)] = entry
+    if not lookup:
+        return re.compile(r"(?!x)x"), lookup
+    # noms les plus longs d'abord : l'alternance retient la correspondance la plus précise
+    alts = sorted(lookup, key=len, reverse=True)
+    pattern = re.compile(r"\b(" + "|".join(re.escape(a) for a in alts) + r")\b")
+    return pattern, lookup
+
+
+def geocode(texts: pd.Series) -> pd.DataFrame:
+    """Géocode une série de textes ; colonnes commune/lat/lon (NaN si inconnu)."""
+    pattern, lookup = load_communes()
+    communes, lats, lons = [], [], []
+    for t in texts.fillna("").astype(str):
+        m = pattern.search(norm_text(t))
+        if m:
+            lat, lon, name = lookup[m.group(1)]
+        else:
+            lat, lon, name = np.nan, np.nan, None
+        communes.append(name); lats.append(lat); lons.append(lon)
+    return pd.DataFrame({"commune": communes, "lat": lats, "lon": lons}, index=texts.index)
+
+
+# --------------------------------------------------------------------
+# 2) Index spatial en grille pour les polygones (point-in-polygon par lot)
+# --------------------------------------------------------------------
+def _feature_rings(geom: Dict) -> List[np.ndarray]:
+    gtype = (geom or {}).get("type")
+    coords = (geom or {}).get("coordinates") or []
+    if gtype == "Polygon":
+        polys = [coords]
+    elif gtype == "MultiPolygon":
+        polys = coords
+    else:
+        return []
+    # anneaux (lon, lat) ; règle pair-impair => les trous sont gérés naturellement
+    return [np.asarray(ring, dtype=float)[:, :2] for poly in polys for ring in poly if len(ring) >= 3]
+
+
+def _points_in_rings(x: np.ndarray, y: np.ndarray, rings: List[np.ndarray]) -> np.ndarray:
+    """Ray casting vectorisé sur les points, pour un polygone (liste d'anneaux)."""
+    inside = np.zeros(len(x), dtype=bool)
+    for ring in rings:
+        xi, yi = ring[:, 0], ring[:, 1]
+        xj, yj = np.roll(xi, 1), np.roll(yi, 1)
+        for a, b, c, d in zip(xi, yi, xj, yj):
+            if b == d:
+                continue
+            cross = (b > y) != (d > y)
+            x_int = (c - a) * (y - b) / (d - b) + a
+            inside ^= cross & (x < x_int)
+    return inside
+
+
+class GridIndex:
+    """Index en grille régulière : maille -> polygones dont la bbox la recouvre."""
+
+    def __init__(self, rings: List[List[np.ndarray]], labels: List[str], cell: float = CELL_DEG):
+        self.rings, self.labels, self.cell = rings, labels, cell
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        for i, poly in enumerate(rings):
+            pts = np.vstack(poly)
+            (x0, y0), (x1, y1) = pts.min(axis=0), pts.max(axis=0)
+            for cx in range(int(np.floor(x0 / cell)), int(np.floor(x1 / cell)) + 1):
+                for cy in range(int(np.floor(y0 / cell)), int(np.floor(y1 / cell)) + 1):
+                    self.cells.setdefault((cx, cy), []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.rings)
+
+    def query(self, lon: np.ndarray, lat: np.ndarray) -> np.ndarray:
+        """Libellé du premier polygone contenant chaque point (None sinon)."""
+        out = np.full(len(lon), None, dtype=object)
+        ok = ~(np.isnan(lon) | np.isnan(lat))
+        if not ok.any() or not self.cells:
+            return out
+        idx = np.flatnonzero(ok)
+        cx = np.floor(lon[idx] / self.cell).astype(int)
+        cy = np.floor(lat[idx] / self.cell).astype(int)
+        keys = np.stack([cx, cy], axis=1)
+        uniq, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        for k, (ux, uy) in enumerate(uniq):
+            cands = self.cells.get((int(ux), int(uy)))
+            if not cands:
+                continue
+            sel = idx[inverse == k]
+            todo = np.ones(len(sel), dtype=bool)
+            for pid in cands:
+                if not todo.any():
+                    break
+                pts = sel[todo]
+                hit = _points_in_rings(lon[pts], lat[pts], self.rings[pid])
+                out[pts[hit]] = self.labels[pid]
+                todo[np.flatnonzero(todo)[hit]] = False
+        return out
+
+
+def _read_geojson(path: str) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return (json.load(f) or {}).get("features", []) or []
+
+
+@lru_cache(maxsize=None)
+def load_zone_index(path: str, props: Tuple[str, ...]) -> GridIndex:
+    rings, labels = [], []
+    for feat in _read_geojson(path):
+        r = _feature_rings(feat.get("geometry"))
+        if not r:
+            continue
+        p = {k.lower(): v for k, v in (feat.get("properties") or {}).items()}
+        label = next((str(p[k]) for k in props if p.get(k) not in (None, "")), "")
+        rings.append(r); labels.append(label)
+    return GridIndex(rings, labels)
+
+
+# --------------------------------------------------------------------
+# 3) Distance au commerce le plus proche (POI locaux)
+# --------------------------------------------------------------------
+@lru_cache(maxsize=None)
+def load_amenities(path: str = AMENITIES_GEOJSON) -> np.ndarray:
+    """Coordonnées (lon, lat) des POI de type Point."""
+    pts = []
+    for feat in _read_geojson(path):
+        geom = feat.get("geometry") or {}
+        if geom.get("type") == "Point" and len(geom.get("coordinates") or []) >= 2:
+            pts.append(geom["coordinates"][:2])
+    return np.asarray(pts, dtype=float).reshape(-1, 2)
+
+
+def nearest_km(lon: np.ndarray, lat: np.ndarray, pois: np.ndarray, chunk: int = 2048) -> np.ndarray:
+    """
+    Distance (km) au POI le plus proche, projection équirectangulaire
+    (suffisante à l'échelle de l'archipel). Calcul matriciel par blocs.
+    """
+    out = np.full(len(lon), np.nan)
+    ok = ~(np.isnan(lon) | np.isnan(lat))
+    if not ok.any() or not len(pois):
+        return out
+    kx = KM_PER_DEG_LAT * np.cos(np.radians(np.nanmean(lat[ok])))
+    px, py = pois[:, 0] * kx, pois[:, 1] * KM_PER_DEG_LAT
+    idx = np.flatnonzero(ok)
+    for s in range(0, len(idx), chunk):
+        part = idx[s:s + chunk]
+        dx = lon[part, None] * kx - px[None, :]
+        dy = lat[part, None] * KM_PER_DEG_LAT - py[None, :]
+        out[part] = np.sqrt((dx * dx + dy * dy).min(axis=1))
+    return out
+
+
+# --------------------------------------------------------------------
+# 4) Étape de pipeline
+# --------------------------------------------------------------------
+def enrich_geo(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Renseigne commune (titre, URL puis description) et, seulement pour les
+    annonces localisées précisément (coordonnées de la page), ppr_zone,
+    plu_zone et dist_amen_min. Un centroïde de commune ne suffit pas :
+    ces champs restent tels quels (règle neutre).
+    """
+    if df.empty:
+        return df
+    df = df.copy()
+
+    def _col(c: str) -> pd.Series:
+        return df[c].fillna("").astype(str) if c in df.columns else pd.Series("", index=df.index)
+
+    text = _col("title") + " " + _col("url") + " " + _col("description")
+    geo = geocode(text)
+    df["commune"] = geo["commune"]
+
+    # Coordonnées : champs lat/lon du connecteur, sinon repérées dans le texte
+    lat = pd.to_numeric(df.get("lat", pd.Series(np.nan, index=df.index)), errors="coerce").to_numpy(float)
+    lon = pd.to_numeric(df.get("lon", pd.Series(np.nan, index=df.index)), errors="coerce").to_numpy(float)
+    missing = np.isnan(lat) | np.isnan(lon)
+    if missing.any():
+        found = np.array([parse_coords(t) for t in text[missing]], dtype=float).reshape(-1, 2)
+        lat[missing], lon[missing] = found[:, 0], found[:, 1]
+    precise = in_guadeloupe(lat, lon)
+    # commune citée : les coordonnées doivent tomber dans son voisinage
+    c_lat, c_lon = geo["lat"].to_numpy(float), geo["lon"].to_numpy(float)
+    kx = KM_PER_DEG_LAT * np.cos(np.radians(np.where(np.isnan(c_lat), 16.2, c_lat)))
+    with np.errstate(invalid="ignore"):
+        far = np.hypot((lon - c_lon) * kx, (lat - c_lat) * KM_PER_DEG_LAT) > MAX_KM_FROM_COMMUNE
+    precise &= ~far
+    lat, lon = np.where(precise, lat, np.nan), np.where(precise, lon, np.nan)
+    df["lat"], df["lon"] = lat, lon
+    df["geo_precision"] = np.where(precise, "coords", np.where(df["commune"].notna(), "commune", None))
+    if not precise.any():
+        return df
+
+    for col, path, props in [("ppr_zone", PPR_GEOJSON, PPR_PROPS), ("plu_zone", PLU_GEOJSON, PLU_PROPS)]:
+        index = load_zone_index(path, tuple(props))
+        if not len(index):
+            continue
+        zones = pd.Series(index.query(lon, lat), index=df.index)
+        df[col] = zones.where(zones.notna() & (zones != ""), df[col])
+
+    pois = load_amenities()
+    if len(pois):
+        minutes = pd.Series(nearest_km(lon, lat, pois) / AVG_SPEED_KMH * 60.0, index=df.index)
+        df["dist_amen_min"] = minutes.round(1).where(minutes.notna(), df["dist_amen_min"])
+    return df
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+from typing import Dict
+
+import pandas as pd
+
+# Version des règles codées dans scoring.py : à incrémenter dès qu'une règle change
+RULES_VERSION = "1"
+
+SCORE_CACHE_COLS = ["id", "fingerprint", "score", "explications"]
+
+
+def _sha1(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def rules_fingerprint(xlsx_path: str | None, targets: Dict, cat_weights: Dict) -> str:
+    """
+    Empreinte du jeu de règles : version du code + cibles + pondérations
+    + contenu de l'Excel de critères (si présent).
+    """
+    h = hashlib.sha1()
+    h.update(RULES_VERSION.encode("utf-8"))
+    h.update(json.dumps(targets, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+    h.update(json.dumps(cat_weights, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+    if xlsx_path and os.path.exists(xlsx_path):
+        with open(xlsx_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def listing_fingerprints(df: pd.DataFrame, rules_fp: str) -> pd.Series:
+    """Empreinte par annonce : champs normalisés + empreinte des règles."""
+    if df.empty:
+        return pd.Series([], index=df.index, dtype=str)
+    cols = sorted(df.columns)
+
+    def _fp(rec: Dict) -> str:
+        payload = json.dumps([rec.get(c) for c in cols], ensure_ascii=False, default=str)
+        return _sha1(rules_fp + payload)
+
+    return pd.Series([_fp(r) for r in df[cols].to_dict("records")], index=df.index, dtype=str)
+
+
+def read_score_cache(path: str) -> pd.DataFrame:
+    if os.path.exists(path):
+        cache = pd.read_csv(path, dtype={"id": str, "fingerprint": str})
+    else:
+        cache = pd.DataFrame(columns=SCORE_CACHE_COLS)
+    for c in SCORE_CACHE_COLS:
+        if c not in cache.columns:
+            cache[c] = pd.NA
+    cache = cache.dropna(subset=["id", "fingerprint"])
+    return cache[SCORE_CACHE_COLS].drop_duplicates("id", keep="last")
+
+
+def write_score_cache(df: pd.DataFrame, path: str) -> None:
+    out = df.copy()
+    for c in SCORE_CACHE_COLS:
+        if c not in out.columns:
+            out[c] = pd.NA
+    out["id"] = out["id"].astype(str)
+    out[SCORE_CACHE_COLS].to_csv(path, index=False)
+
+
+def split_by_cache(df: pd.DataFrame, cache: pd.DataFrame):
+    """
+    Sépare les annonces dont l'empreinte est inchangée (score réutilisé)
+    de celles à rescorer. Renvoie (df_avec_scores_cachés, masque_à_scorer).
+    """
+    out = df.copy()
+    keys = out["id"].astype(str)
+    cached = cache.assign(id=cache["id"].astype(str)).drop_duplicates("id", keep="last").set_index("id")
+    fp_prev = keys.map(cached["fingerprint"])
+    hit = fp_prev.notna() & (fp_prev == out["fingerprint"])
+    out["score"] = keys.map(cached["score"]).where(hit)
+    # colonne texte même à froid (sinon float NaN, incompatible avec les explications assignées ensuite)
+    out["explications"] = keys.map(cached["explications"]).where(hit).astype(object)
+    out["score"] = pd.to_numeric(out["score"], errors="coerce")
+    return out, ~hit
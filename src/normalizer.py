@@ -6,7 +6,7 @@ WANTED_COLS = [
     "id","title","url","price_total","surface_hab","bedrooms","copro_lots","charges_copro_an",
     "taxe_fonciere","ppr_zone","plu_zone","age_days","price_drop_pct","status","rent_potential",
     "capex_ratio","yield_net","cashflow","division_possible","colocation_ready","outdoor",
-    "sanitation","dist_amen_min","photos","source_name"
+    "sanitation","dist_amen_min","photos","source_name","description","dpe","pool","garden","terrace","lat","lon"
 ]
 
 def normalize(df: pd.DataFrame) -> pd.DataFrame:
@@ -28,11 +28,15 @@ def normalize(df: pd.DataFrame) -> pd.DataFrame:
     for c in num_cols:
         df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0)
 
+    # Coordonnées : NaN si inconnues (0 serait une position)
+    for c in ["lat","lon"]:
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+
     # Types spécifiques
     df["bedrooms"] = df["bedrooms"].astype(int)
     df["copro_lots"] = df["copro_lots"].astype(int)
 
-    for b in ["division_possible","colocation_ready","outdoor"]:
+    for b in ["division_possible","colocation_ready","outdoor","pool","garden","terrace"]:
         df[b] = df[b].fillna(False).astype(bool)
 
     # Photos en liste
@@ -44,6 +48,8 @@ def normalize(df: pd.DataFrame) -> pd.DataFrame:
         return [x]
     df["photos"] = df["photos"].apply(_to_list)
 
+    df["description"] = df["description"].fillna("").astype(str)
+
     # Statut par défaut
     df["status"] = df["status"].fillna("available")
 
@@ -0,0 +1,188 @@
+import hashlib
+import html
+import json
+import os
+from datetime import datetime, timezone
+from string import Template
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+
+# --------------------------------------------------------------------
+# Rapport HTML statique : gabarits compilés une fois, sections
+# re-rendues uniquement si les annonces sous-jacentes ont changé
+# --------------------------------------------------------------------
+REPORTS_DIR = "reports"
+REPORT_CACHE = "data/report_cache.json"
+DROP_MIN_PCT = 5.0
+
+# Champs affichés : seuls leurs changements déclenchent un nouveau rendu
+DISPLAY_COLS = [
+    "id", "url", "title", "score", "price_total", "surface_hab", "bedrooms", "price_drop_pct",
+    "yield_net", "dpe", "photos", "source_name", "commune",
+]
+
+PAGE = Template("""<!doctype html>
+<html lang="fr"><head><meta charset="utf-8">
+<title>$title</title>
+<style>
+body{font-family:system-ui,sans-serif;margin:24px;color:#111827;background:#f9fafb}
+h1{margin-bottom:4px}section{margin:28px 0}
+.card{display:flex;gap:16px;background:#fff;border:1px solid #e5e7eb;border-radius:10px;padding:12px;margin:10px 0}
+.card img{width:160px;height:110px;object-fit:cover;border-radius:6px}
+.badge{background:#1f2937;color:#fff;padding:2px 8px;border-radius:12px;margin-right:6px;font-size:.85em}
+.muted{color:#6b7280;font-size:.9em}table{border-collapse:collapse;background:#fff}
+td,th{border:1px solid #e5e7eb;padding:6px 10px;text-align:right}td:first-child,th:first-child{text-align:left}
+</style></head><body>
+<h1>$title</h1><p class="muted">Généré le $generated</p>
+$sections
+</body></html>
+""")
+
+SECTION = Template("""<section id="$key"><h2>$heading</h2>
+$body
+</section>""")
+
+CARD = Template("""<div class="card">$photo<div>
+<h3><a href="$url">$title</a></h3>
+<p><strong>Score : $score/100</strong> · $price · $surface m² · $bedrooms ch.</p>
+<p>$badges</p><p class="muted">$source · $commune</p>
+</div></div>""")
+
+ITEM = Template("""<li><a href="$url">$title</a> — $price <span class="muted">($source)</span></li>""")
+
+STATS_ROW = Template("""<tr><td>$source</td><td>$count</td><td>$median_price</td><td>$mean_score</td></tr>""")
+
+EMPTY = "<p class=\"muted\">Rien à signaler.</p>"
+
+
+def _e(x) -> str:
+    return html.escape("" if x is None or pd.isna(x) else str(x))
+
+
+def _price(x) -> str:
+    try:
+        return f"{int(float(x)):,} €".replace(",", " ")
+    except Exception:
+        return "—"
+
+
+def _num(x, fmt="{:.0f}") -> str:
+    try:
+        return fmt.format(float(x)) if not pd.isna(x) else "—"
+    except Exception:
+        return "—"
+
+
+def _card(r: Dict) -> str:
+    photos = r.get("photos")
+    photos = list(photos) if photos is not None and not isinstance(photos, str) else ([photos] if photos else [])
+    photo = f'<img src="{_e(photos[0])}" alt="" loading="lazy">' if photos else ""
+    badges = []
+    if float(r.get("price_drop_pct") or 0) > 0:
+        badges.append(f"↓ {float(r['price_drop_pct']):.0f}%")
+    if not pd.isna(r.get("yield_net")) and r.get("yield_net") is not None:
+        badges.append(f"Rdt {float(r['yield_net']):.1f}%")
+    if isinstance(r.get("dpe"), str) and r["dpe"]:
+        badges.append(f"DPE {r['dpe']}")
+    return CARD.substitute(
+        photo=photo, url=_e(r.get("url") or "#"), title=_e(r.get("title") or "Bien à vendre"),
+        score=_num(r.get("score"), "{:.1f}"), price=_price(r.get("price_total")),
+        surface=_num(r.get("surface_hab")), bedrooms=_num(r.get("bedrooms")),
+        badges="".join(f'<span class="badge">{_e(b)}</span>' for b in badges),
+        source=_e(r.get("source_name")), commune=_e(r.get("commune") or "—"),
+    )
+
+
+def render_cards(df: pd.DataFrame) -> str:
+    return "\n".join(_card(r) for r in df.to_dict("records")) or EMPTY
+
+
+def render_list(df: pd.DataFrame) -> str:
+    items = [ITEM.substitute(url=_e(r.get("url") or "#"), title=_e(r.get("title")),
+                             price=_price(r.get("price_total")), source=_e(r.get("source_name")))
+             for r in df.to_dict("records")]
+    return f"<ul>{''.join(items)}</ul>" if items else EMPTY
+
+
+def render_stats(df: pd.DataFrame) -> str:
+    if df.empty:
+        return EMPTY
+    rows = [STATS_ROW.substitute(source=_e(r["source_name"]), count=int(r["count"]),
+                                 median_price=_price(r["median_price"]), mean_score=_num(r["mean_score"], "{:.1f}"))
+            for r in df.to_dict("records")]
+    return ("<table><tr><th>Source</th><th>Annonces</th><th>Prix médian</th><th>Score moyen</th></tr>"
+            + "".join(rows) + "</table>")
+
+
+def source_stats(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty or "source_name" not in df.columns:
+        return pd.DataFrame(columns=["source_name", "count", "median_price", "mean_score"])
+    score = df["score"] if "score" in df.columns else pd.Series(float("nan"), index=df.index)
+    return (df.assign(_score=score).groupby("source_name", dropna=False)
+              .agg(count=("id", "size"), median_price=("price_total", "median"), mean_score=("_score", "mean"))
+              .reset_index().sort_values("count", ascending=False))
+
+
+def _digest(df: pd.DataFrame, cols: List[str] | None = None) -> str:
+    """Empreinte du contenu d'une section (ordre et valeurs affichées ; toutes les colonnes si `cols` vide)."""
+    cols = [c for c in cols if c in df.columns] if cols else list(df.columns)
+    return hashlib.sha1(df[cols].to_json(orient="values", default_handler=str).encode("utf-8")).hexdigest()
+
+
+def _read_cache(path: str) -> Dict[str, Dict[str, str]]:
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f) or {}
+        except Exception:
+            return {}
+    return {}
+
+
+def render_report(df: pd.DataFrame, new: pd.DataFrame | None = None, profile: str = "top10",
+                  top_k: int = 10, path: str | None = None, cache_path: str = REPORT_CACHE) -> int:
+    """
+    Écrit le rapport HTML du profil. Renvoie le nombre de sections re-rendues
+    (0 = rien n'a changé, le fichier existant est conservé).
+    """
+    path = path or f"{REPORTS_DIR}/{profile}.html"
+    ranked = df.sort_values("score", ascending=False) if "score" in df.columns else df
+    drops = pd.to_numeric(ranked.get("price_drop_pct", pd.Series(0.0, index=ranked.index)), errors="coerce").fillna(0)
+    ranked = ranked.assign(price_drop_pct=drops)
+    # (clé, titre, annonces de la section, rendu, colonnes de l'empreinte ; None = toutes)
+    sections: List[Tuple[str, str, pd.DataFrame, Callable[[pd.DataFrame], str], List[str] | None]] = [
+        ("top", f"Top {top_k}", ranked.head(top_k), render_cards, DISPLAY_COLS),
+        ("drops", "Baisses de prix", ranked[drops >= DROP_MIN_PCT].sort_values("price_drop_pct", ascending=False),
+         render_cards, DISPLAY_COLS),
+        ("new", "Nouvelles annonces depuis le dernier passage", new if new is not None else ranked.iloc[0:0],
+         render_list, DISPLAY_COLS),
+        ("sources", "Statistiques par source", source_stats(df), render_stats, None),
+    ]
+
+    cache = _read_cache(cache_path)
+    rendered, rebuilt = [], 0
+    for key, heading, part, renderer, digest_cols in sections:
+        ckey = f"{profile}:{key}"
+        digest = _digest(part, digest_cols)
+        hit = cache.get(ckey)
+        if not hit or hit.get("digest") != digest:
+            hit = {"digest": digest, "html": SECTION.substitute(key=key, heading=_e(heading), body=renderer(part))}
+            cache[ckey] = hit
+            rebuilt += 1
+        rendered.append(hit["html"])
+
+    if rebuilt == 0 and os.path.exists(path):
+        return 0
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    page = PAGE.substitute(
+        title=_e(f"{profile.capitalize()} — Guadeloupe"),
+        generated=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC"),
+        sections="\n".join(rendered),
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(page)
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+    return rebuilt
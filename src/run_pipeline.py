@@ -4,11 +4,29 @@ import pandas as pd
 from datetime import datetime, timezone
 
 from src.scoring import load_calibration, build_targets, score_listing
-from src.normalizer import normalize
+from src.normalizer import normalize, WANTED_COLS
+from src.text_features import enrich_text
+from src.geo import enrich_geo
+from src.finance import enrich_finance
+from src.exports import export_listings, read_listings, diff_runs, LISTINGS_PARQUET
+from src.report import render_report
+from src.events import detect_events, append_events
+from src.incremental import (
+    rules_fingerprint, listing_fingerprints, read_score_cache, write_score_cache, split_by_cache,
+    SCORE_CACHE_COLS
+)
 from src.connectors.collect import collect_all
 
 DATA_DIR = "data"
 SNAPSHOT_CSV = f"{DATA_DIR}/snapshot.csv"
+SCORE_CACHE_CSV = f"{DATA_DIR}/scores_cache.csv"
+SNAPSHOT_COLS = [
+    "id","url","title","source_name","first_seen","last_seen","last_price","status","price_drop_pct",
+    "last_score","returned","misses"
+]
+# Passages consécutifs sans l'annonce (sa source ayant répondu) avant de la marquer "removed"
+REMOVED_AFTER_MISSES = 2
+CRITERIA_XLSX = "criteres_recherche_immo_FINAL.xlsx"
 
 
 def _utcnow_iso() -> str:
@@ -26,7 +44,7 @@ BASE_COLS = [
     "copro_lots","charges_copro_an","taxe_fonciere","ppr_zone","plu_zone",
     "age_days","price_drop_pct","status","rent_potential","capex_ratio",
     "yield_net","cashflow","division_possible","colocation_ready","outdoor",
-    "sanitation","dist_amen_min","photos","source_name"
+    "sanitation","dist_amen_min","photos","source_name","description","lat","lon"
 ]
 
 
@@ -55,15 +73,16 @@ def _ensure_cols(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def load_sources_data() -> pd.DataFrame:
-    rows = collect_all()  # liste de dicts (peut être vide)
+def load_sources_data(rows=None) -> pd.DataFrame:
+    if rows is None:
+        rows = collect_all()  # liste de dicts (peut être vide)
     df = pd.DataFrame(rows) if rows else pd.DataFrame(columns=BASE_COLS)
     df = _ensure_cols(df)
     return df[BASE_COLS]
 
 
 def read_snapshot() -> pd.DataFrame:
-    cols = ["id","first_seen","last_seen","last_price","status","price_drop_pct"]
+    cols = SNAPSHOT_COLS
     if os.path.exists(SNAPSHOT_CSV):
         snap = pd.read_csv(SNAPSHOT_CSV)
     else:
@@ -74,23 +93,34 @@ def read_snapshot() -> pd.DataFrame:
             snap[c] = pd.NA
     snap["status"] = snap["status"].fillna("available")
     snap["price_drop_pct"] = pd.to_numeric(snap["price_drop_pct"], errors="coerce").fillna(0.0)
+    snap["returned"] = snap["returned"].fillna(False).astype(bool)
+    snap["misses"] = pd.to_numeric(snap["misses"], errors="coerce").fillna(0).astype(int)
+    snap["id"] = snap["id"].astype(str)
     return snap[cols]
 
 
 def write_snapshot(df: pd.DataFrame) -> None:
-    cols = ["id","first_seen","last_seen","last_price","status","price_drop_pct"]
+    cols = SNAPSHOT_COLS
     for c in cols:
         if c not in df.columns:
             df[c] = pd.NA
     df["status"] = df["status"].fillna("available")
     df["price_drop_pct"] = pd.to_numeric(df["price_drop_pct"], errors="coerce").fillna(0.0)
+    df["returned"] = df["returned"].fillna(False).astype(bool)
+    df["misses"] = pd.to_numeric(df["misses"], errors="coerce").fillna(0).astype(int)
     df[cols].to_csv(SNAPSHOT_CSV, index=False)
 
 
-def update_history(df_now: pd.DataFrame) -> pd.DataFrame:
+def update_history(df_now: pd.DataFrame, prev: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Met à jour l'historique : annonces vues ce run + annonces disparues
+    conservées. Une annonce absente n'est marquée "removed" qu'après
+    REMOVED_AFTER_MISSES passages où sa source a bien renvoyé des annonces
+    (une panne de source ne crée ni retrait ni fausse remise en vente).
+    """
     ensure_dirs()
     df_now = _ensure_cols(df_now.copy())
-    prev = read_snapshot().set_index("id")
+    prev = (read_snapshot() if prev is None else prev).drop_duplicates("id", keep="last").set_index("id")
 
     out = []
     for _, r in df_now.iterrows():
@@ -100,10 +130,12 @@ def update_history(df_now: pd.DataFrame) -> pd.DataFrame:
         price = float(r.get("price_total", 0) or 0)
         status = str(r.get("status", "available") or "available")
         now = _utcnow_iso()
+        meta = dict(url=r.get("url"), title=r.get("title"), source_name=r.get("source_name"))
 
         if rid in prev.index:
             first_seen = prev.loc[rid, "first_seen"]
             last_price = float(prev.loc[rid, "last_price"] or 0)
+            returned = bool(prev.loc[rid, "returned"]) or prev.loc[rid, "status"] == "removed"
             drop = 0.0
             if price and last_price and price < last_price:
                 try:
@@ -111,33 +143,62 @@ def update_history(df_now: pd.DataFrame) -> pd.DataFrame:
                 except Exception:
                     drop = 0.0
             out.append(dict(
-                id=rid, first_seen=first_seen, last_seen=now,
-                last_price=price, status=status, price_drop_pct=drop
+                id=rid, **meta, first_seen=first_seen, last_seen=now,
+                last_price=price, status=status, price_drop_pct=drop,
+                last_score=prev.loc[rid, "last_score"], returned=returned, misses=0
             ))
         else:
             out.append(dict(
-                id=rid, first_seen=now, last_seen=now,
-                last_price=price, status=status, price_drop_pct=0.0
+                id=rid, **meta, first_seen=now, last_seen=now,
+                last_price=price, status=status, price_drop_pct=0.0,
+                last_score=pd.NA, returned=False, misses=0
             ))
 
-    snap_new = pd.DataFrame(out)
+    # Annonces disparues : on les garde ; absence comptée seulement si leur source a répondu
+    seen = {r["id"] for r in out}
+    gone = prev.loc[~prev.index.isin(seen)].reset_index()
+    active = set(df_now["source_name"].dropna().astype(str))
+    src = gone["source_name"]
+    # source inconnue (ancien snapshot) : absence comptée dès qu'un run a collecté quelque chose
+    missed = src.astype(str).isin(active) | (src.isna() & bool(len(df_now)))
+    missed &= gone["status"] != "removed"
+    gone["misses"] = pd.to_numeric(gone["misses"], errors="coerce").fillna(0).astype(int) + missed.astype(int)
+    gone.loc[gone["misses"] >= REMOVED_AFTER_MISSES, "status"] = "removed"
+    gone["price_drop_pct"] = 0.0
+
+    parts = [p for p in (pd.DataFrame(out, columns=SNAPSHOT_COLS), gone[SNAPSHOT_COLS]) if len(p)]
+    snap_new = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=SNAPSHOT_COLS)
     snap_new = _ensure_cols(snap_new)  # assure status/price_drop_pct présents
     write_snapshot(snap_new)
     return snap_new
 
 
+def record_scores(hist: pd.DataFrame, df: pd.DataFrame) -> pd.DataFrame:
+    """Mémorise le dernier score de chaque annonce dans l'historique."""
+    if df.empty or "score" not in df.columns:
+        return hist
+    scores = df.assign(_id=df["id"].astype(str)).drop_duplicates("_id").set_index("_id")["score"]
+    hist = hist.copy()
+    hist["last_score"] = hist["id"].astype(str).map(scores).fillna(hist["last_score"])
+    write_snapshot(hist)
+    return hist
+
+
 def enrich_with_history(df: pd.DataFrame, hist: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df.assign(price_drop_pct=0.0, age_days=0, is_returned=False, status="available")
 
     # Sécuriser hist
-    for c in ["id","first_seen","last_seen","last_price","status","price_drop_pct"]:
+    for c in SNAPSHOT_COLS:
         if c not in hist.columns:
             hist[c] = pd.NA
     hist["status"] = hist["status"].fillna("available")
     hist["price_drop_pct"] = pd.to_numeric(hist["price_drop_pct"], errors="coerce").fillna(0.0)
 
-    merged = df.merge(hist[["id","first_seen","last_seen","last_price","status","price_drop_pct"]], on="id", how="left")
+    # L'historique fait foi pour status / price_drop_pct (évite les colonnes _x/_y)
+    merged = df.drop(columns=["status", "price_drop_pct"], errors="ignore").merge(
+        hist[["id","first_seen","last_seen","last_price","status","price_drop_pct","returned"]].drop_duplicates("id"),
+        on="id", how="left")
 
     # Filets post-merge
     if "status" not in merged.columns:
@@ -152,20 +213,52 @@ def enrich_with_history(df: pd.DataFrame, hist: pd.DataFrame) -> pd.DataFrame:
     merged["age_days"] = merged["first_seen"].apply(
         lambda x: 0 if pd.isna(x) else (pd.Timestamp.utcnow() - pd.to_datetime(x, utc=True)).days
     )
-    merged["is_returned"] = False
-    return merged
-
-
-def main():
+    merged["is_returned"] = merged["returned"].fillna(False).astype(bool)
+    return merged.drop(columns=["returned"])
+
+
+class PipelineState:
+    """
+    État conservé entre deux passages (mode démon) : règles parsées,
+    historique, cache de scores et dernier export restent en mémoire.
+    Un passage unique (cron) part d'un état vide et relit les fichiers.
+    `pool` : pool de processus de l'extraction texte, fourni par le démon.
+    """
+
+    def __init__(self, criteria_xlsx: str = CRITERIA_XLSX):
+        self.criteria_xlsx = criteria_xlsx
+        self._rules = None
+        self._rules_mtime = None
+        self.hist = None
+        self.score_cache = None
+        self.previous = None
+        self.pool = None
+
+    def rules(self):
+        """(targets, cat_weights, rules_fp), rechargés seulement si l'Excel a changé."""
+        mtime = os.path.getmtime(self.criteria_xlsx) if os.path.exists(self.criteria_xlsx) else None
+        if self._rules is None or mtime != self._rules_mtime:
+            crit_df, cat_weights = load_calibration(self.criteria_xlsx)
+            targets = build_targets(crit_df)
+            self._rules = (targets, cat_weights, rules_fingerprint(self.criteria_xlsx, targets, cat_weights))
+            self._rules_mtime = mtime
+        return self._rules
+
+
+def run_once(rows=None, state: PipelineState | None = None) -> pd.DataFrame:
+    """Un passage complet ; `rows` = annonces déjà collectées (sinon collecte de toutes les sources)."""
     ensure_dirs()
+    state = state or PipelineState()
 
     # 1) Calibration (Excel)
-    crit_df, cat_weights = load_calibration("criteres_recherche_immo_FINAL.xlsx")
-    targets = build_targets(crit_df)
+    targets, cat_weights, rules_fp = state.rules()
 
     # 2) Collecte
-    raw = load_sources_data()          # garantit status/price_drop_pct
-    hist = update_history(raw)         # garantit status/price_drop_pct dans snapshot
+    raw = load_sources_data(rows)      # garantit status/price_drop_pct
+    # une même fiche peut être atteinte depuis plusieurs pages de liste : une ligne par annonce
+    raw = raw.assign(id=raw["id"].astype(str)).drop_duplicates("id", keep="last").reset_index(drop=True)
+    prev_hist = state.hist if state.hist is not None else read_snapshot()  # état avant ce run
+    hist = update_history(raw, prev_hist)  # garantit status/price_drop_pct dans snapshot
 
     # 3) Normalisation + enrichissement
     df = normalize(raw)                # remet toutes les colonnes attendues
@@ -176,30 +269,69 @@ def main():
         df["price_drop_pct"] = 0.0
     df["price_drop_pct"] = pd.to_numeric(df["price_drop_pct"], errors="coerce").fillna(0.0)
 
+    df = enrich_text(df, pool=state.pool)  # lots, charges, taxe foncière, DPE, extérieurs
+    df = enrich_geo(df)                # PPR / PLU / distance commerces (couches locales)
+    df = enrich_finance(df)            # loyer, rendement net, cashflow, ratio travaux
+
+    # Empreinte sur les champs normalisés (avant l'historique, qui varie à chaque run)
+    df["fingerprint"] = listing_fingerprints(df[WANTED_COLS], rules_fp)
+
     df = enrich_with_history(df, hist)
 
-    # 4) Scoring
+    # 4) Scoring incrémental : on ne rescore que les empreintes modifiées
+    cache = state.score_cache if state.score_cache is not None else read_score_cache(SCORE_CACHE_CSV)
+    df, to_score = split_by_cache(df, cache)
     scores, logs = [], []
-    for _, row in df.iterrows():
+    for _, row in df[to_score].iterrows():
         s, e = score_listing(row, targets, cat_weights)
         scores.append(s); logs.append(e)
 
     if len(df):
-        df["score"] = scores
-        df["explications"] = logs
+        df.loc[to_score, "score"] = scores
+        df.loc[to_score, "explications"] = logs
+        df["explications"] = df["explications"].fillna("")
+        write_score_cache(df, SCORE_CACHE_CSV)
+        state.score_cache = (df[SCORE_CACHE_COLS].assign(id=df["id"].astype(str))
+                             .drop_duplicates("id", keep="last"))
         df = df.sort_values("score", ascending=False).reset_index(drop=True)
+        print("Scoring —", int(to_score.sum()), "annonces rescorées,", int((~to_score).sum()), "reprises du cache")
     else:
         df["score"] = []
         df["explications"] = []
 
-    # 5) Exports
-    df.head(10).to_excel("output/top10.xlsx", index=False)
-    df.to_csv("output/all_listings.csv", index=False)
-    with open("reports/top10.html", "w", encoding="utf-8") as f:
-        f.write("<html><body><h2>Top 10 — Guadeloupe</h2><p>Généré automatiquement.</p></body></html>")
+    # 5) Événements (nouveautés, baisses, remises en vente, retraits, seuil de score)
+    n_events = append_events(detect_events(df, prev_hist, hist))
+    state.hist = record_scores(hist, df)
+    print("Événements —", n_events, "ajoutés au flux")
+
+    # 6) Exports (Parquet ; Excel/CSV à la demande : python -m src.exports xlsx 10)
+    previous = state.previous if state.previous is not None else read_listings(LISTINGS_PARQUET)
+    export_listings(df)
+    state.previous = df
+    delta = diff_runs(df, previous)
+    print("Diff —", len(delta["new"]), "nouvelles,", len(delta["removed"]), "retirées,",
+          len(delta["changed"]), "modifiées")
+    rebuilt = render_report(df, new=delta["new"])
+    print("Rapport —", rebuilt, "sections re-rendues")
 
     print("Pipeline OK —", len(df), "annonces traitées")
+    return df
+
+
+def main():
+    run_once()
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Pipeline annonces Guadeloupe")
+    parser.add_argument("--daemon", action="store_true", help="mode démon (caches chauds, rafraîchissement par source)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tick", type=float, default=30.0, help="période de vérification des sources (s)")
+    args = parser.parse_args()
+    if args.daemon:
+        from src.daemon import run_daemon
+        run_daemon(host=args.host, port=args.port, tick=args.tick)
+    else:
+        main()
@@ -154,11 +154,13 @@ def score_listing(row: Dict, targets: Dict, cat_weights: Dict) -> Tuple[float, s
     if t:
         try:
             capex = float(row.get("capex_ratio", ""))
+            capex = None if pd.isna(capex) else capex
         except Exception:
             capex = None
         y = 0.0
         try:
             y = float(row.get("yield_net", 0) or 0)
+            y = 0.0 if pd.isna(y) else y
         except Exception:
             pass
         ok = True if capex is None else ((capex <= 0.25) or (capex > 0.25 and y >= 8.5))
@@ -168,7 +170,7 @@ def score_listing(row: Dict, targets: Dict, cat_weights: Dict) -> Tuple[float, s
     if t:
         try:
             y = float(row.get("yield_net", 0) or 0)
-            ok = y >= 5.0
+            ok = True if pd.isna(y) else y >= 5.0  # neutre si non calculable
         except Exception:
             ok = True
         apply_rule(ok, t, "Travaux & Potentiel")
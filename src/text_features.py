@@ -0,0 +1,174 @@
+import multiprocessing
+import os
+import re
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+# --------------------------------------------------------------------
+# Extraction de caractéristiques depuis le texte des annonces :
+# un seul motif compilé (alternance de groupes nommés), un seul passage
+# --------------------------------------------------------------------
+_NUM = r"\d{1,3}(?:[ .]\d{3})+|\d+"
+_AMOUNT = rf"(?:{_NUM})(?:,\d{{1,2}})?"  # montants à la française : "1 200,50"
+_NOT = r"(?<!sans )(?<!pas de )"
+
+FEATURE_RE = re.compile("|".join([
+    # copropriété : "copropriété de 24 lots", "nombre de lots : 24", "24 lots principaux"
+    # (un "N lots" isolé — honoraires, référence... — n'est pas retenu)
+    rf"(?P<lots>nombre de lots\s*(?:principaux\s*)?[:=]?\s*(?P<lots_a>\d{{1,4}})"
+    rf"|(?:copropriete|copro|immeuble|residence)\b[^.]{{0,40}}?\b(?P<lots_b>\d{{1,4}})\s*lots\b"
+    rf"|(?P<lots_c>\d{{1,4}})\s*lots principaux\b)",
+    # charges de copropriété, annuelles ou mensuelles
+    rf"(?P<charges>charges(?:\s+de)?(?:\s+copropriete|\s+copro)?"
+    rf"(?:\s+(?P<charges_pre>annuelles?|mensuelles?|par an|par mois))?"
+    rf"\s*[:=]?\s*(?:de\s+)?(?P<charges_n>{_AMOUNT})\s*(?P<charges_cur>eur(?:os)?\b|e\b)?\s*"
+    rf"(?P<charges_post>/\s*an|/\s*mois|par an|par mois|annuel\w*|mensuel\w*)?)",
+    # taxe foncière ("taxe fonciere 2023 : 1 200" : l'année n'est pas le montant)
+    rf"(?P<taxe>taxe fonciere\s*(?:annuelle\s*)?(?:(?:19|20)\d\d\s*)?[:=]?\s*(?:de\s+)?(?P<taxe_n>{_AMOUNT}))",
+    # DPE : lettre seule en fin de proposition ("dpe a venir" n'est pas une classe A)
+    r"(?P<dpe>(?:dpe|classe energie|classe energetique|performance energetique)"
+    r"\s*[:=]?\s*(?:classe\s*)?(?P<dpe_c>[a-g])\b(?=\s*(?:$|[^a-z\s]|ges\b)))",
+    # extérieurs
+    rf"(?P<pool>{_NOT}\bpiscines?\b)",
+    rf"(?P<garden>{_NOT}\bjardins?\b)",
+    rf"(?P<terrace>{_NOT}\b(?:terrasses?|varangues?|decks?)\b)",
+]))
+
+FEATURE_COLS = ["copro_lots", "charges_copro_an", "taxe_fonciere", "dpe", "pool", "garden", "terrace"]
+
+MAX_LOTS = 500       # au-delà, ce n'est pas un nombre de lots plausible
+BATCH_MIN = 200      # en dessous, le coût de démarrage du pool n'est pas rentable
+CHUNKSIZE = 64
+
+
+def prepare_text(text: str) -> str:
+    """Minuscules sans accents ; ponctuation conservée pour les montants."""
+    t = str(text or "").replace("€", " eur ")  # sinon perdu à la translittération
+    t = unicodedata.normalize("NFKD", t).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"\s+", " ", t.lower())
+
+
+def _to_num(s: str) -> float:
+    """ "1 200,50" / "1.200" -> 1200.5 / 1200.0 """
+    return float(re.sub(r"[ .]", "", s).replace(",", "."))
+
+
+def extract_features(text: str) -> Dict:
+    """Un seul balayage du texte ; la première occurrence de chaque champ l'emporte."""
+    out: Dict = {c: None for c in FEATURE_COLS}
+    for c in ("pool", "garden", "terrace"):
+        out[c] = False
+    for m in FEATURE_RE.finditer(prepare_text(text)):
+        kind = m.lastgroup
+        if kind == "lots" and out["copro_lots"] is None:
+            lots = int(m.group("lots_a") or m.group("lots_b") or m.group("lots_c"))
+            if 0 < lots <= MAX_LOTS:
+                out["copro_lots"] = lots
+        elif kind == "charges" and out["charges_copro_an"] is None:
+            period = (m.group("charges_pre") or "") + (m.group("charges_post") or "")
+            if not period and not m.group("charges_cur"):
+                continue  # "charges 12 lots" : ni devise ni période, pas un montant
+            val = _to_num(m.group("charges_n"))
+            out["charges_copro_an"] = round(val * 12 if ("mois" in period or "mensuel" in period) else val, 2)
+        elif kind == "taxe" and out["taxe_fonciere"] is None:
+            out["taxe_fonciere"] = round(_to_num(m.group("taxe_n")), 2)
+        elif kind == "dpe" and out["dpe"] is None:
+            out["dpe"] = m.group("dpe_c").upper()
+        elif kind in ("pool", "garden", "terrace"):
+            out[kind] = True
+    return out
+
+
+def text_pool(workers: Optional[int] = None) -> Optional[ProcessPoolExecutor]:
+    """
+    Pool réutilisable d'un passage à l'autre (mode démon). Contexte spawn :
+    le démon fait tourner le serveur de santé dans un thread, un fork y est risqué.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def extract_batch(texts: List[str], workers: Optional[int] = None,
+                  pool: Optional[ProcessPoolExecutor] = None) -> List[Dict]:
+    """Extraction par lot, répartie sur un pool de processus pour les gros volumes (`pool` si fourni)."""
+    if pool is not None:
+        if len(texts) < BATCH_MIN:
+            return [extract_features(t) for t in texts]
+        return list(pool.map(extract_features, texts, chunksize=CHUNKSIZE))
+    workers = workers or os.cpu_count() or 1
+    if len(texts) < BATCH_MIN or workers <= 1:
+        return [extract_features(t) for t in texts]
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(extract_features, texts, chunksize=CHUNKSIZE))
+
+
+def enrich_text(df: pd.DataFrame, workers: Optional[int] = None,
+                pool: Optional[ProcessPoolExecutor] = None) -> pd.DataFrame:
+    """
+    Complète copro_lots, charges_copro_an, taxe_fonciere, dpe et les
+    indicateurs d'extérieur depuis title + description, sans écraser
+    une valeur déjà renseignée par un connecteur.
+    """
+    if df.empty:
+        return df
+    df = df.copy()
+    text = df["title"].fillna("").astype(str)
+    if "description" in df.columns:
+        text = text + " \n " + df["description"].fillna("").astype(str)
+    feats = pd.DataFrame(extract_batch(text.tolist(), workers, pool), index=df.index)
+
+    for c in ["copro_lots", "charges_copro_an", "taxe_fonciere"]:
+        cur = pd.to_numeric(df[c], errors="coerce").fillna(0)
+        df[c] = cur.where(cur > 0, pd.to_numeric(feats[c], errors="coerce").fillna(0))
+    df["copro_lots"] = df["copro_lots"].astype(int)
+    df["dpe"] = df["dpe"].where(df["dpe"].notna() & (df["dpe"] != ""), feats["dpe"])
+    for c in ["pool", "garden", "terrace"]:
+        df[c] = df[c].astype(bool) | feats[c].astype(bool)
+    df["outdoor"] = df["outdoor"].astype(bool) | df["pool"] | df["garden"] | df["terrace"]
+    return df
+
+
+# --------------------------------------------------------------------
+# Banc d'essai : python -m src.text_features <dossier_html> [attendu.json]
+# --------------------------------------------------------------------
+def benchmark(html_dir: str, expected_path: Optional[str] = None, workers: Optional[int] = None) -> Dict:
+    """Débit (pages/s) et, si un fichier d'attendus est fourni, précision par champ."""
+    import json
+    from bs4 import BeautifulSoup
+    from src.connectors.common import page_text
+
+    names = sorted(n for n in os.listdir(html_dir) if n.endswith((".html", ".htm")))
+    texts = []
+    for n in names:
+        with open(os.path.join(html_dir, n), "r", encoding="utf-8", errors="ignore") as f:
+            texts.append(page_text(BeautifulSoup(f.read(), "html.parser")))  # même texte que les connecteurs
+
+    t0 = time.perf_counter()
+    results = extract_batch(texts, workers)
+    elapsed = time.perf_counter() - t0
+    report: Dict = {"pages": len(texts), "seconds": round(elapsed, 4),
+                    "pages_per_s": round(len(texts) / elapsed, 1) if elapsed else None}
+
+    if expected_path:
+        with open(expected_path, "r", encoding="utf-8") as f:
+            expected = json.load(f)  # {"fichier.html": {"copro_lots": 12, ...}}
+        hits: Dict[str, List[int]] = {}
+        for n, res in zip(names, results):
+            for field, want in (expected.get(n) or {}).items():
+                hits.setdefault(field, []).append(int(res.get(field) == want))
+        report["accuracy"] = {k: round(sum(v) / len(v), 3) for k, v in hits.items()}
+    return report
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python -m src.text_features <dossier_html> [attendu.json]")
+        sys.exit(1)
+    print(benchmark(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None))
@@ -1,12 +1,12 @@
 # streamlit_app.py
 import os, pandas as pd, streamlit as st
+from src.exports import read_listings, LISTINGS_PARQUET
 
 st.set_page_config(page_title="opportunité immobilière Guadeloupe", layout="wide")
 st.title("opportunité immobilière Guadeloupe")
 st.caption("Top 10 mis à jour automatiquement selon vos critères (Excel).")
 
-TOP_PATH = "output/top10.xlsx"
-ALL_PATH = "output/all_listings.csv"
+TOP_PATH = "output/top10.xlsx"   # ancien format, lu si le Parquet n'existe pas encore
 
 def badge(txt):
     st.markdown(
@@ -102,11 +102,21 @@ def card(row):
         urls = _valid_photo_urls(row.get("photos"))
         _safe_show_images(urls)
 
+def load_top(n=10):
+    if os.path.exists(LISTINGS_PARQUET):
+        df = read_listings(LISTINGS_PARQUET)
+        if "score" in df.columns:
+            df = df.sort_values("score", ascending=False)
+        return df.head(n)
+    if os.path.exists(TOP_PATH):
+        return pd.read_excel(TOP_PATH)
+    return None
+
 def show_top():
-    if not os.path.exists(TOP_PATH):
+    df = load_top()
+    if df is None:
         st.warning("Le classement n’a pas encore été généré.")
         return
-    df = pd.read_excel(TOP_PATH)
     if df.empty:
         st.info("Aucune annonce chargée pour l’instant. Les connecteurs s’exécutent — repasse plus tard.")
         return
@@ -124,11 +134,11 @@ def show_top():
 show_top()
 
 st.divider()
-with st.expander("🔎 Toutes les annonces (CSV)"):
-    if os.path.exists(ALL_PATH):
+with st.expander("🔎 Toutes les annonces"):
+    if os.path.exists(LISTINGS_PARQUET):
         try:
-            df_all = pd.read_csv(ALL_PATH)
+            df_all = read_listings(LISTINGS_PARQUET).drop(columns=["description"], errors="ignore")
             st.dataframe(df_all.head(200))
         except Exception:
-            st.caption("CSV indisponible pour le moment.")
+            st.caption("Données indisponibles pour le moment.")
 st.caption("© Agent IA — Guadeloupe")
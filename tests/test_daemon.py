@@ -0,0 +1,96 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src import daemon
+from src.daemon import Metrics, run_daemon
+
+DETAIL = """<html><head><title>Maison</title></head><body>
+<h1>Maison F4 Le Gosier</h1><div class="price">250 000 €</div><div class="surface">95 m²</div>
+<p>Copropriété de 12 lots, charges 85,50 € / mois. Piscine, jardin.</p></body></html>"""
+
+
+@pytest.fixture
+def site():
+    """Sitemap + fiche d'annonce servis en local."""
+    pages = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = pages.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/xml" if self.path.endswith(".xml") else "text/html")
+            self.end_headers()
+            self.wfile.write(body.encode("utf-8"))
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    base = f"http://127.0.0.1:{server.server_port}"
+    pages["/sitemap.xml"] = (f'<?xml version="1.0"?><urlset><url><loc>{base}/annonce/971-gosier-f4-1</loc></url>'
+                             '</urlset>')
+    pages["/annonce/971-gosier-f4-1"] = DETAIL
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield base
+    server.shutdown()
+    server.server_close()
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as r:
+            return r.status, r.read().decode("utf-8")
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode("utf-8")
+
+
+def test_daemon_serves_health_and_metrics_after_a_run(site, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(daemon, "load_sources_config", lambda: {"sources": [
+        {"name": "Laforet971", "enabled": True, "sitemap": f"{site}/sitemap.xml", "refresh_minutes": 60},
+    ]})
+    metrics, stop = Metrics(), threading.Event()
+    loop = threading.Thread(target=run_daemon, kwargs=dict(port=0, tick=30.0, max_cycles=1, stop=stop,
+                                                            metrics=metrics))
+    loop.start()
+    try:
+        deadline = time.time() + 60
+        while metrics.last_ok is None and loop.is_alive() and time.time() < deadline:
+            time.sleep(0.1)
+        base = f"http://127.0.0.1:{metrics.port}"
+
+        code, body = _get(f"{base}/health")
+        health = json.loads(body)
+        assert code == 200 and health["status"] == "ok"
+        assert health["runs"] == 1 and health["listings"] == 1
+        assert health["sources"]["Laforet971"]["rows"] == 1
+
+        code, body = _get(f"{base}/metrics")
+        assert code == 200
+        assert "immo_up 1" in body and "immo_listings 1" in body
+        assert 'immo_source_rows{source="Laforet971"} 1' in body
+    finally:
+        stop.set()
+        loop.join(10)
+    assert not loop.is_alive()
+
+
+def test_health_degrades_after_failed_or_stale_run():
+    m = Metrics(stale_after=60)
+    assert m.health()["status"] == "starting"
+    m.run_done(1.0, 10)
+    assert m.health()["status"] == "ok"
+    m.run_done(1.0, None)
+    assert m.health()["status"] == "degraded"
+    m.run_done(1.0, 10)
+    m.last_run -= 120
+    assert m.health()["status"] == "degraded"
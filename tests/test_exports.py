@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from src.exports import diff_runs, export_listings, read_listings
+
+
+def _df(price):
+    return pd.DataFrame([dict(id="a1", title="A1", price_total=price, photos=["https://a.com/1.jpg"])])
+
+
+def test_export_keeps_previous_run(tmp_path):
+    path, prev = tmp_path / "listings.parquet", tmp_path / "listings_prev.parquet"
+    export_listings(_df(100), str(path), str(prev))
+    export_listings(_df(90), str(path), str(prev))
+    assert read_listings(str(path))["price_total"].tolist() == [90]
+    assert read_listings(str(prev))["price_total"].tolist() == [100]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["listings.parquet", "listings_prev.parquet"]
+
+
+def test_failed_write_leaves_current_listings_in_place(tmp_path, monkeypatch):
+    path, prev = tmp_path / "listings.parquet", tmp_path / "listings_prev.parquet"
+    export_listings(_df(100), str(path), str(prev))
+
+    def boom(*args, **kwargs):
+        raise OSError("disque plein")
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", boom)
+    with pytest.raises(OSError):
+        export_listings(_df(90), str(path), str(prev))
+    monkeypatch.undo()
+    assert read_listings(str(path))["price_total"].tolist() == [100]
+    assert not prev.exists()
+    assert [p.name for p in tmp_path.iterdir()] == ["listings.parquet"]
+
+
+def test_diff_runs_with_duplicate_ids():
+    cur = pd.DataFrame([dict(id="a1", price_total=90), dict(id="a1", price_total=90), dict(id="b1", price_total=5)])
+    prev = pd.DataFrame([dict(id="a1", price_total=100), dict(id="b1", price_total=5)])
+    delta = diff_runs(cur, prev)
+    assert delta["changed"]["id"].tolist() == ["a1"]
+    assert delta["new"].empty and delta["removed"].empty
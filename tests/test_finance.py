@@ -0,0 +1,24 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.finance import FINANCE_YAML, estimate_capex, load_finance_config
+
+# chemin absolu : d'autres tests changent de répertoire courant (config mise en cache)
+CFG = os.path.join(os.path.dirname(__file__), "..", FINANCE_YAML)
+
+
+@pytest.mark.parametrize("text, eur_m2", [
+    ("Maison à rénover entièrement", 900),
+    ("Appartement, travaux à prévoir", 350),
+    ("Villa, aucun travaux à prévoir", 0),
+    ("Maison sans gros travaux, à rafraîchir", 350),
+    ("Appartement refait à neuf", 0),
+    ("Grande maison neuf pièces avec jardin", 100),
+    ("Maison neuve", 0),
+    ("Proche des Travauxville, vue mer", 100),
+])
+def test_capex_cues(text, eur_m2):
+    df = pd.DataFrame({"title": [text], "surface_hab": [100]})
+    assert estimate_capex(df, load_finance_config(CFG))[0] == eur_m2 * 100
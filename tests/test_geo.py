@@ -0,0 +1,82 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from bs4 import BeautifulSoup
+
+from src import geo
+from src.connectors.common import page_coords
+
+GOSIER = (16.206, -61.493)  # centroïde de config/communes_971.yaml
+
+
+@pytest.fixture
+def red_zone(tmp_path, monkeypatch):
+    """Zone rouge PPR couvrant tout le Gosier (centroïde compris)."""
+    ring = [[-61.52, 16.18], [-61.46, 16.18], [-61.46, 16.23], [-61.52, 16.23], [-61.52, 16.18]]
+    path = tmp_path / "ppr.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": [
+        {"type": "Feature", "properties": {"zone": "rouge"}, "geometry": {"type": "Polygon", "coordinates": [ring]}},
+    ]}))
+    monkeypatch.setattr(geo, "PPR_GEOJSON", str(path))
+    monkeypatch.setattr(geo, "load_amenities", lambda: np.array([[GOSIER[1], GOSIER[0]]]))
+    geo.load_communes.cache_clear()
+    return path
+
+
+def _df(**cols):
+    base = dict(id="1", url="https://x.fr/vente/1", title="Maison", description="",
+                ppr_zone="", plu_zone="", dist_amen_min=0.0, lat=np.nan, lon=np.nan)
+    return pd.DataFrame([{**base, **cols}])
+
+
+def test_commune_only_listing_keeps_neutral_zones(red_zone):
+    out = geo.enrich_geo(_df(title="Maison Le Gosier"))
+    assert out.loc[0, "commune"] == "Le Gosier"
+    assert out.loc[0, "geo_precision"] == "commune"
+    assert out.loc[0, "ppr_zone"] == "" and out.loc[0, "dist_amen_min"] == 0.0
+
+
+def test_page_coordinates_fill_zones_and_distance(red_zone):
+    out = geo.enrich_geo(_df(title="Maison Le Gosier", lat=16.2101, lon=-61.4902))
+    assert out.loc[0, "geo_precision"] == "coords"
+    assert out.loc[0, "ppr_zone"] == "rouge"
+    assert 0 < out.loc[0, "dist_amen_min"] < 5
+
+
+def test_commune_and_coordinates_found_in_description(red_zone):
+    out = geo.enrich_geo(_df(description="Villa au Gosier, GPS 16.2101, -61.4902. Vue mer."))
+    assert out.loc[0, "commune"] == "Le Gosier"
+    assert out.loc[0, "ppr_zone"] == "rouge"
+
+
+def test_page_coords_reads_meta_and_ignores_out_of_area():
+    soup = BeautifulSoup('<meta name="geo.position" content="16.2101;-61.4902">', "html.parser")
+    assert page_coords(soup) == (16.2101, -61.4902)
+    paris = BeautifulSoup('<div data-lat="48.8566" data-lng="2.3522"></div>', "html.parser")
+    assert page_coords(paris) == (None, None)
+
+
+AGENCY_PAGE = """<html><body><h1>Maison F5 Sainte-Rose</h1>
+<script type="application/ld+json">{"@context": "https://schema.org", "@graph": [
+  {"@type": "RealEstateAgent", "name": "Agence du Gosier",
+   "geo": {"@type": "GeoCoordinates", "latitude": 16.2061, "longitude": -61.493}},
+  {"@type": "SingleFamilyResidence", "name": "Maison F5"}]}</script>
+<footer><iframe src="https://maps.google.com/maps?q=16.2061,-61.4930&output=embed"></iframe></footer>
+</body></html>"""
+
+
+def test_agency_footer_and_json_ld_are_not_listing_coordinates():
+    assert page_coords(BeautifulSoup(AGENCY_PAGE, "html.parser")) == (None, None)
+    listing = AGENCY_PAGE.replace('"name": "Maison F5"',
+                                  '"geo": {"latitude": 16.3321, "longitude": -61.6975}')
+    assert page_coords(BeautifulSoup(listing, "html.parser")) == (16.3321, -61.6975)
+
+
+def test_coordinates_far_from_named_commune_are_not_precise(red_zone):
+    # carte de l'agence du Gosier sur une annonce de Sainte-Rose
+    out = geo.enrich_geo(_df(title="Maison Sainte-Rose", lat=16.2061, lon=-61.493))
+    assert out.loc[0, "commune"] == "Sainte-Rose"
+    assert out.loc[0, "geo_precision"] == "commune"
+    assert out.loc[0, "ppr_zone"] == "" and np.isnan(out.loc[0, "lat"])
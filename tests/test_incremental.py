@@ -0,0 +1,24 @@
+import warnings
+
+import pandas as pd
+
+from src.incremental import SCORE_CACHE_COLS, split_by_cache
+
+
+def test_cold_cache_accepts_explanations_without_warning():
+    df = pd.DataFrame({"id": ["a", "b"], "fingerprint": ["f1", "f2"]})
+    out, to_score = split_by_cache(df, pd.DataFrame(columns=SCORE_CACHE_COLS))
+    assert to_score.all()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        out.loc[to_score, "explications"] = ["ok a", "ok b"]
+    assert list(out["explications"]) == ["ok a", "ok b"]
+
+
+def test_duplicate_ids_in_cache_do_not_break_lookup():
+    df = pd.DataFrame({"id": ["a", "a", "b"], "fingerprint": ["f1", "f1", "f2"]})
+    cache = pd.DataFrame({"id": ["a", "a"], "fingerprint": ["f1", "f1"],
+                          "score": [40.0, 42.0], "explications": ["x", "y"]})
+    out, to_score = split_by_cache(df, cache)
+    assert list(to_score) == [False, False, True]
+    assert list(out["score"].iloc[:2]) == [42.0, 42.0]
@@ -0,0 +1,32 @@
+import json
+
+import pandas as pd
+
+from src.report import render_report
+
+
+def _listings(price_b, score_b):
+    return pd.DataFrame([
+        dict(id="a1", url="https://a.com/1", title="A1", source_name="a.com", price_total=200000, score=50.0),
+        dict(id="b1", url="https://b.com/1", title="B1", source_name="b.com", price_total=price_b, score=score_b),
+    ])
+
+
+def test_sources_section_rebuilds_when_stats_change(tmp_path):
+    html_path, cache_path = tmp_path / "top10.html", tmp_path / "cache.json"
+    render_report(_listings(300000, 0.0), path=str(html_path), cache_path=str(cache_path))
+    before = json.loads(cache_path.read_text())["top10:sources"]["digest"]
+
+    render_report(_listings(90000, 100.0), path=str(html_path), cache_path=str(cache_path))
+    after = json.loads(cache_path.read_text())["top10:sources"]
+
+    assert after["digest"] != before
+    assert "90 000 €" in after["html"] and "100.0" in after["html"]
+    assert "300 000 €" not in html_path.read_text()
+
+
+def test_unchanged_listings_rebuild_nothing(tmp_path):
+    html_path, cache_path = tmp_path / "top10.html", tmp_path / "cache.json"
+    df = _listings(300000, 0.0)
+    assert render_report(df, path=str(html_path), cache_path=str(cache_path)) == 4
+    assert render_report(df, path=str(html_path), cache_path=str(cache_path)) == 0
@@ -0,0 +1,80 @@
+import pytest
+
+from src import incremental, run_pipeline as rp
+from src.events import read_new_events
+
+
+def _row(i, price=100000, source="x.fr"):
+    return dict(id=f"https://{source}/vente/{i}", url=f"https://{source}/vente/{i}", title=f"Maison Le Gosier {i}",
+                price_total=price, surface_hab=60, bedrooms=2, photos=[], source_name=source,
+                description="copropriété de 10 lots")
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(rp, "SNAPSHOT_CSV", str(tmp_path / "data" / "snapshot.csv"))
+    monkeypatch.setattr(rp, "SCORE_CACHE_CSV", str(tmp_path / "data" / "scores_cache.csv"))
+    return tmp_path
+
+
+def test_duplicate_ids_survive_consecutive_daemon_passes(workdir):
+    state = rp.PipelineState()
+    rows = [_row(1), _row(1), _row(2)]  # même fiche atteinte depuis deux pages de liste
+    rp.run_once(rows, state)
+    df = rp.run_once(rows, state)
+    assert not df.empty
+    assert state.score_cache["id"].is_unique
+
+
+def test_duplicate_count_changing_between_runs(workdir):
+    rp.run_once([_row(1), _row(1), _row(2)])
+    df = rp.run_once([_row(1), _row(2)])
+    assert df["id"].is_unique and len(df) == 2
+    assert (workdir / "reports" / "top10.html").exists()
+    assert rp.read_listings(rp.LISTINGS_PARQUET)["id"].is_unique
+
+
+def test_only_changed_listings_are_rescored(workdir, monkeypatch):
+    calls = []
+    score = rp.score_listing
+    monkeypatch.setattr(rp, "score_listing", lambda row, *a: calls.append(row["id"]) or score(row, *a))
+    rows = [_row(1), _row(2), _row(3)]
+
+    def run(batch):
+        calls.clear()
+        rp.run_once(batch)  # passage "cron" : cache relu depuis le CSV
+        return sorted(calls)
+
+    assert len(run(rows)) == 3
+    assert run(rows) == []
+    assert run([_row(1), _row(2, price=90000), _row(3)]) == ["https://x.fr/vente/2"]
+    monkeypatch.setattr(incremental, "RULES_VERSION", incremental.RULES_VERSION + "-test")
+    assert len(run(rows)) == 3
+
+
+def _status(state, rid):
+    return state.hist.set_index("id").loc[rid, ["status", "returned"]].tolist()
+
+
+def test_source_outage_neither_removes_nor_relists(workdir):
+    state = rp.PipelineState()
+    rows = [_row(1), _row(2, source="y.fr")]
+    for batch in (rows, rows[:1], rows[:1], rows):  # y.fr muet deux passages
+        rp.run_once(batch, state)
+    assert _status(state, "https://y.fr/vente/2") == ["available", False]
+    types = {e["type"] for e in read_new_events("test")}
+    assert not types & {"removed", "relisted"}
+
+
+def test_listing_removed_after_consecutive_misses_keeps_url_and_title(workdir):
+    state = rp.PipelineState()
+    rp.run_once([_row(1), _row(2)], state)
+    rp.run_once([_row(1)], state)
+    assert _status(state, "https://x.fr/vente/2") == ["available", False]
+    rp.run_once([_row(1)], state)
+    assert _status(state, "https://x.fr/vente/2") == ["removed", False]
+
+    removed = [e for e in read_new_events("test") if e["type"] == "removed"]
+    assert len(removed) == 1
+    assert removed[0]["url"] == "https://x.fr/vente/2" and removed[0]["title"] == "Maison Le Gosier 2"
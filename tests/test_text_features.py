@@ -0,0 +1,61 @@
+from src.text_features import extract_features
+
+
+def test_decimal_comma_monthly_charges_are_annualized():
+    assert extract_features("Charges : 85,50 € / mois")["charges_copro_an"] == 1026.0
+
+
+def test_thousands_separator_amounts():
+    feats = extract_features("Charges annuelles 1.800 euros. Taxe foncière : 1 100 €")
+    assert feats["charges_copro_an"] == 1800.0
+    assert feats["taxe_fonciere"] == 1100.0
+
+
+def test_lots_need_a_copropriete_context():
+    assert extract_features("Honoraires 3 lots. Immeuble de 12 lots")["copro_lots"] == 12
+    assert extract_features("Ref 2024 lots")["copro_lots"] is None
+    assert extract_features("45 lots principaux")["copro_lots"] == 45
+    assert extract_features("Copropriété de 9999 lots")["copro_lots"] is None
+
+
+def test_pending_dpe_is_not_a_class():
+    for text in ["DPE : à venir", "DPE vierge", "DPE en cours"]:
+        assert extract_features(text)["dpe"] is None, text
+    assert extract_features("DPE : D - GES : B")["dpe"] == "D"
+    assert extract_features("Classe énergie C, GES A")["dpe"] == "C"
+
+
+def test_years_and_counts_are_not_amounts():
+    assert extract_features("Taxe foncière 2023 : 1 200 €")["taxe_fonciere"] == 1200.0
+    assert extract_features("Charges 12 lots")["charges_copro_an"] is None
+    assert extract_features("Charges : 1 200 €")["charges_copro_an"] == 1200.0
+
+
+def test_negated_outdoor_flags():
+    feats = extract_features("Belle varangue, sans piscine, jardin privatif")
+    assert (feats["pool"], feats["garden"], feats["terrace"]) == (False, True, True)
+
+
+def test_benchmark_on_stored_fixtures():
+    import os
+    from src.text_features import benchmark
+
+    html_dir = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+    report = benchmark(html_dir, os.path.join(html_dir, "expected.json"), workers=1)
+    assert report["pages"] == 4
+    assert report["pages_per_s"] > 100
+    assert report["accuracy"] == {k: 1.0 for k in
+                                  ["copro_lots", "charges_copro_an", "taxe_fonciere", "dpe", "pool", "garden", "terrace"]}
+
+
+def test_shared_pool_is_reused_across_batches():
+    from src.text_features import BATCH_MIN, extract_batch, text_pool
+
+    texts = ["Copropriété de 12 lots, DPE : C, piscine", "Charges : 85,50 € / mois"] * (BATCH_MIN // 2)
+    expected = [extract_features(t) for t in texts]
+    pool = text_pool(2)
+    try:
+        assert extract_batch(texts, pool=pool) == expected
+        assert extract_batch(texts, pool=pool) == expected  # même pool, second passage
+    finally:
+        pool.shutdown()